@@ -0,0 +1,164 @@
+"""
+end-to-end benchmark of FTPClient against a local in-process ftp server
+
+spins up pyftpdlib on 127.0.0.1 serving synthetic trees, optionally with
+injected per-command latency and per-connection bandwidth, and times
+`apply_file_to_download` and `download` for each tree and worker count.
+
+    pip install -r requirements-dev.txt
+    python bench/bench_ftp.py --latency 0.02 --workers 1 4 8 --output result.json
+    python bench/bench_ftp.py --latency 0.02 --workers 1 4 8 --compare result.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 테스트와 같은 로컬 ftp 서버 사용
+sys.path[:0] = [BASE_DIR, os.path.join(BASE_DIR, 'test')]
+from ftp.ftp_client import FTPClient
+from ftp.pool import FTPConnectionPool
+from ftp_server import HAS_PYFTPDLIB, start_server, throttled
+
+if not HAS_PYFTPDLIB:
+    sys.exit('pyftpdlib is required for the benchmark: pip install -r requirements-dev.txt')
+from pyftpdlib.handlers import FTPHandler
+
+# name -> list of (relative path, size)
+TREES = {
+    'small_files': lambda: [
+        (f'd{i // 100:02d}/f{i:04d}.dat', 4 * 1024) for i in range(1000)],
+    'huge_files': lambda: [
+        (f'big{i}.dat', 64 * 2 ** 20) for i in range(2)],
+    'deep_tree': lambda: [
+        ('/'.join(f'l{level}' for level in range(depth)) + f'/f{depth}.dat', 16 * 1024)
+        for depth in range(1, 31)],
+    'wide_tree': lambda: [
+        (f'w{i:03d}/f.dat', 16 * 1024) for i in range(300)],
+}
+
+
+def make_tree(root: str, name: str) -> tuple:
+    files = TREES[name]()
+    rnd = random.Random(0)
+    chunk = rnd.randbytes(2 ** 20)
+    for path, size in files:
+        full_path = os.path.join(root, name, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            for offset in range(0, size, len(chunk)):
+                f.write(chunk[:min(len(chunk), size - offset)])
+
+    return len(files), sum(size for _, size in files)
+
+
+def bench_handler(latency: float, bandwidth: int):
+    """ ftp handler adding `latency` per command and limiting each data connection to `bandwidth` """
+
+    class LatencyHandler(FTPHandler):
+        banner = 'filedown bench'
+
+        def pre_process_command(self, line, cmd, arg):
+            # 제어 연결 왕복 지연 흉내
+            if latency:
+                time.sleep(latency)
+            return super().pre_process_command(line, cmd, arg)
+
+    return throttled(LatencyHandler, bandwidth) if bandwidth else LatencyHandler
+
+
+def run_case(port: int, tree: str, workers: int, local_dir: str) -> dict:
+    shutil.rmtree(local_dir, ignore_errors=True)
+    pool = FTPConnectionPool()
+    ftp_client = FTPClient('127.0.0.1', 'anonymous', 'bench@', port)
+    ftp_client.pool = pool
+    ftp_client.workers = workers
+
+    started = time.perf_counter()
+    ftp_client.apply_file_to_download(f'/{tree}', local_dir)
+    apply_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ftp_client.download()
+    download_seconds = time.perf_counter() - started
+    pool.close()
+
+    metrics = ftp_client.metrics.snapshot()
+    return dict(
+        tree=tree, workers=workers,
+        files=len(ftp_client.file_downloaded), failed=len(ftp_client.file_failed),
+        bytes=metrics['bytes_done'],
+        apply_seconds=round(apply_seconds, 4),
+        download_seconds=round(download_seconds, 4),
+        files_per_second=round(len(ftp_client.file_downloaded) / download_seconds, 2),
+        mib_per_second=round(metrics['bytes_done'] / 2 ** 20 / download_seconds, 2))
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path) as f:
+        baseline = {(r['tree'], r['workers']): r for r in json.load(f)['results']}
+
+    regressions = 0
+    for result in results:
+        before = baseline.get((result['tree'], result['workers']))
+        if before is None:
+            continue
+        for key in ('apply_seconds', 'download_seconds'):
+            if before[key] and result[key] > before[key] * (1 + tolerance):
+                regressions += 1
+                print(f"REGRESSION {result['tree']} workers={result['workers']} {key}: "
+                      f"{before[key]:.3f}s -> {result[key]:.3f}s")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--trees', nargs='+', default=list(TREES), choices=list(TREES))
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added per command')
+    parser.add_argument('--bandwidth', type=int, default=0, help='bytes/s per data connection')
+    parser.add_argument('--output', help='write results as json')
+    parser.add_argument('--compare', help='earlier --output file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown ratio')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = os.path.join(temp_dir, 'remote')
+        local_dir = os.path.join(temp_dir, 'local')
+        for tree in args.trees:
+            make_tree(root, tree)
+
+        server, port = start_server(root, bench_handler(args.latency, args.bandwidth))
+        results = list()
+        try:
+            print(f'{"tree":<12} {"workers":>7} {"files":>6} {"apply s":>8} '
+                  f'{"download s":>10} {"files/s":>8} {"MiB/s":>8}')
+            for tree in args.trees:
+                for workers in args.workers:
+                    result = run_case(port, tree, workers, local_dir)
+                    results.append(result)
+                    print(f"{tree:<12} {workers:>7} {result['files']:>6} "
+                          f"{result['apply_seconds']:>8.3f} {result['download_seconds']:>10.3f} "
+                          f"{result['files_per_second']:>8.1f} {result['mib_per_second']:>8.1f}")
+        finally:
+            server.close_all()
+
+    report = dict(
+        latency=args.latency, bandwidth=args.bandwidth,
+        python=sys.version.split()[0], results=results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        sys.exit(1 if compare(results, args.compare, args.tolerance) else 0)
+
+
+if __name__ == '__main__':
+    main()
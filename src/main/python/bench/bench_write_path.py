@@ -0,0 +1,92 @@
+"""
+compare the old retrbinary-style write path with the recv_into path
+
+a sender thread pushes data through a local socket pair, standing in for
+the ftp data connection, and the receiver writes it to a temp file:
+
+- `recv + f.write`: new bytes object per block, buffered file (ftplib default)
+- `recv_into + raw write`: one reusable bytearray, unbuffered file
+
+    python bench/bench_write_path.py --size 512 --blocksize 8192 65536 262144 --dir /dev/shm
+"""
+import os
+import time
+import socket
+import argparse
+import tempfile
+import threading
+
+
+def send(sock: socket.socket, total: int) -> None:
+    chunk = b'\0' * (256 * 1024)
+    sent = 0
+    with sock:
+        while sent < total:
+            sent += sock.send(chunk[:total - sent])
+
+
+def receive_recv(sock: socket.socket, path: str, blocksize: int) -> int:
+    received = 0
+    with open(path, 'wb') as f:
+        while True:
+            data = sock.recv(blocksize)
+            if not data:
+                break
+            f.write(data)
+            received += len(data)
+    return received
+
+
+def receive_recv_into(sock: socket.socket, path: str, blocksize: int) -> int:
+    buffer = bytearray(blocksize)
+    view = memoryview(buffer)
+    received = 0
+    with open(path, 'wb', buffering=0) as f:
+        while True:
+            size = sock.recv_into(buffer)
+            if not size:
+                break
+            written = 0
+            while written < size:
+                written += f.write(view[written:size])
+            received += size
+    return received
+
+
+def run(receiver, total: int, blocksize: int, path: str) -> float:
+    recv_sock, send_sock = socket.socketpair()
+    sender = threading.Thread(target=send, args=(send_sock, total))
+
+    started = time.perf_counter()
+    sender.start()
+    with recv_sock:
+        received = receiver(recv_sock, path, blocksize)
+    elapsed = time.perf_counter() - started
+    sender.join()
+
+    assert received == total, (received, total)
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--size', type=int, default=256, help='MiB per run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case (best is kept)')
+    parser.add_argument('--blocksize', type=int, nargs='+', default=[8192, 65536, 262144])
+    parser.add_argument(
+        '--dir', help='directory for the output file (e.g. /dev/shm to take the disk out)')
+    args = parser.parse_args()
+
+    total = args.size * 2 ** 20
+    receivers = [('recv + f.write', receive_recv), ('recv_into + raw write', receive_recv_into)]
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        path = os.path.join(temp_dir, 'bench.bin')
+        print(f'{"blocksize":>10} {"write path":<24} {"MiB/s":>10}')
+        for blocksize in args.blocksize:
+            for name, receiver in receivers:
+                best = max(run(receiver, total, blocksize, path) for _ in range(args.repeat))
+                print(f'{blocksize:>10} {name:<24} {best / 2 ** 20:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+import sys
+
+from ftp.cli import main
+
+
+if __name__ == '__main__':
+    # 후처리 프로세스 풀(forkserver/spawn)이 이 모듈을 다시 import 해도 실행되지 않도록
+    sys.exit(main())
@@ -0,0 +1,513 @@
+"""
+asyncio ftp client: many control and data connections on one event loop
+
+covers the core of FTPClient (listing, filtering, sync, resume, retry,
+metrics) for mirrors of many small files, where one thread per session
+costs more than the transfers themselves. Passive mode only.
+
+    ftp_client = AsyncFTPClient.from_cfg(get_cfg('config.yml'))
+    asyncio.run(ftp_client.mirror([('/', 'download')]))
+"""
+import os
+import re
+import shutil
+import asyncio
+import ftplib
+import logging
+
+from ftp.base import BaseFTPClient
+from ftp.ftp_file import FTPFile
+from ftp.listing import parse_list_line, parse_mlsd_line
+from ftp.retry import save_failed_files
+
+_PASV_RE = re.compile(r'(\d+),(\d+),(\d+),(\d+),(\d+),(\d+)')
+_EPSV_RE = re.compile(r'\(([^\d])\1\1(\d+)\1\)')
+
+
+class AsyncFTPSession:
+    """ one control connection speaking the subset of FTP the client needs """
+    # ftplib.FTP 와 같은 인코딩, 디코딩할 수 없는 바이트는 surrogateescape 로 그대로 왕복
+    encoding = 'utf-8'
+
+    def __init__(self, host: str, port: int=21, timeout: float=60):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._use_epsv = True
+
+    async def connect(self, username: str, password: str) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        await self.reply('2')
+        if (await self.command(f'USER {username}', '23')).startswith('3'):
+            await self.command(f'PASS {password}', '2')
+        await self.command('TYPE I', '2')
+
+    async def command(self, line: str, expect: str='2') -> str:
+        """ send a command and return its reply, raising ftplib errors like `voidcmd` """
+        self._writer.write(f'{line}\r\n'.encode(self.encoding, 'surrogateescape'))
+        await self._writer.drain()
+        return await self.reply(expect)
+
+    async def reply(self, expect: str='2') -> str:
+        line = await self._readline()
+        if line[3:4] == '-':
+            # 여러 줄 응답: 같은 코드 + 공백으로 시작하는 줄까지 읽음
+            code = line[:3]
+            lines = [line]
+            while True:
+                lines.append(await self._readline())
+                if lines[-1][:3] == code and lines[-1][3:4] != '-':
+                    break
+            line = '\n'.join(lines)
+
+        if line[:1] not in expect:
+            if line[:1] == '4':
+                raise ftplib.error_temp(line)
+            if line[:1] == '5':
+                raise ftplib.error_perm(line)
+            raise ftplib.error_reply(line)
+        return line
+
+    async def transfer(self, line: str, rest: int=None):
+        """
+        open a passive data connection and start `line` (RETR, MLSD, LIST)
+
+        :return: (reader, writer) of the data connection, call `reply`
+            after reading it to get the transfer result
+        """
+        host, port = await self._passive_address()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), self.timeout)
+        try:
+            if rest:
+                await self.command(f'REST {rest}', '3')
+            await self.command(line, '1')
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def lines(self, line: str, blocksize: int=64 * 1024) -> list:
+        reader, writer = await self.transfer(line)
+        chunks = list()
+        try:
+            # 전체가 아닌 한 번 읽을 때마다 timeout 적용, 큰 목록도 받는 동안은 끊지 않음
+            while True:
+                chunk = await asyncio.wait_for(reader.read(blocksize), self.timeout)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            writer.close()
+        data = b''.join(chunks)
+        await self.reply('2')
+        return data.decode(self.encoding, 'surrogateescape').splitlines()
+
+    async def size(self, ftp_path: str):
+        try:
+            return int((await self.command(f'SIZE {ftp_path}')).split()[-1])
+        except (ftplib.error_perm, ValueError):
+            return None
+
+    async def pwd(self) -> str:
+        return ftplib.parse257(await self.command('PWD'))
+
+    async def quit(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self.command('QUIT', '2'), 5)
+        except (*ftplib.all_errors, asyncio.TimeoutError):
+            pass
+        self.close()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _passive_address(self) -> tuple:
+        if self._use_epsv:
+            try:
+                match = _EPSV_RE.search(await self.command('EPSV', '2'))
+                if match:
+                    return self.host, int(match.group(2))
+            except ftplib.error_perm:
+                self._use_epsv = False
+
+        match = _PASV_RE.search(await self.command('PASV', '2'))
+        if match is None:
+            raise ftplib.error_proto('unexpected PASV reply')
+        numbers = [int(n) for n in match.groups()]
+        # ftplib 과 같이 응답의 주소 대신 제어 연결 주소 사용 (NAT 뒤 서버 대응)
+        return self.host, (numbers[4] << 8) + numbers[5]
+
+    async def _readline(self) -> str:
+        line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+        if not line:
+            raise EOFError('connection closed by server')
+        return line.decode(self.encoding, 'surrogateescape').rstrip('\r\n')
+
+
+class AsyncFTPClient(BaseFTPClient):
+    default_workers = 16
+
+    def __init__(self, url: str, username: str='ananoymous', password: str='anonymous@',
+                 port: int=21):
+        super().__init__(url, username, password, port)
+        self.queue_size = 1000
+        self.timeout = 60
+
+        self._idle = None
+        self._sessions = None
+
+    @classmethod
+    def from_cfg(cls, ftp_cfg: dict) -> 'AsyncFTPClient':
+        """
+        create client from the `ftp` block of config.yml, keys without an
+        asyncio counterpart (segments, rate limits, verify, ...) are ignored
+
+        :param dict ftp_cfg: config data (see `get_cfg`)
+        """
+        if not ftp_cfg.get('passive_mode', True):
+            raise ValueError('the asyncio client supports passive mode only')
+
+        ftp_client = super().from_cfg(ftp_cfg)
+        ftp_client.queue_size = ftp_cfg.get('queue_size', 1000)
+
+        return ftp_client
+
+    async def connect(self) -> None:
+        """ prepare the session pool, at most `workers` sessions are open at once """
+        if self._sessions is None:
+            self._idle = list()
+            self._sessions = asyncio.Semaphore(max(1, self.workers))
+
+    async def disconnect(self) -> None:
+        """ close every idle session """
+        if self._idle is None:
+            return
+        idle, self._idle = self._idle, list()
+        await asyncio.gather(*(session.quit() for session in idle))
+        self._sessions = None
+
+    async def apply_file_to_download(self, ftp_dir: str, local_dir: str='.') -> int:
+        """ :return: number of files queued, files already queued are skipped """
+        async with self._connected():
+            count = 0
+            async for ftp_file in self.iter_file_to_download(ftp_dir, local_dir):
+                count += self._file_to_download.push(ftp_file)
+            return count
+
+    async def iter_file_to_download(self, ftp_dir: str, local_dir: str='.'):
+        """
+        walk `ftp_dir` breadth-first with `workers` concurrent listings,
+        yielding FTPFile as they are discovered. Listing pauses while
+        `queue_size` found files wait to be consumed.
+        """
+        async with self._connected():
+            dir_queue = asyncio.Queue()
+            found_queue = asyncio.Queue(self.queue_size)
+            dir_queue.put_nowait((ftp_dir, local_dir, 0))
+
+            async def finish():
+                await dir_queue.join()
+                await found_queue.put(None)
+
+            tasks = [
+                asyncio.ensure_future(self._crawl_worker(dir_queue, found_queue))
+                for _ in range(max(1, self.workers))]
+            tasks.append(asyncio.ensure_future(finish()))
+            try:
+                while True:
+                    item = await found_queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def download(self, signal=None) -> None:
+        """
+        download every queued file over `workers` concurrent sessions
+
+        :param signal: object with `emit(ftp_file)`, called per completed file
+        """
+        self._file_to_download.order = self.order
+        work_queue = asyncio.Queue()
+        index = 0
+        while self._file_to_download:
+            ftp_file = self._file_to_download.pop()
+            self.metrics.add_expected(ftp_file.size)
+            work_queue.put_nowait((index, ftp_file))
+            index += 1
+
+        async with self._connected(), self._workers(work_queue, signal):
+            pass
+
+    async def mirror(self, ftp_dirs, signal=None, found_signal=None) -> None:
+        """
+        scan and download at the same time, the scan waits while
+        `queue_size` files are waiting for a download session
+
+        :param ftp_dirs: iterable of (ftp_dir, local_dir)
+        :param signal: object with `emit(ftp_file)`, called per completed file
+        :param found_signal: object with `emit(ftp_file)`, called per discovered file
+        """
+        work_queue = asyncio.Queue(self.queue_size)
+        index = 0
+        seen = set()
+        async with self._connected(), self._workers(work_queue, signal):
+            for ftp_dir, local_dir in ftp_dirs:
+                async for ftp_file in self.iter_file_to_download(ftp_dir, local_dir):
+                    if ftp_file.ftp_path in seen:
+                        continue
+                    seen.add(ftp_file.ftp_path)
+                    if found_signal:
+                        found_signal.emit(ftp_file)
+                    self.metrics.add_expected(ftp_file.size)
+                    await work_queue.put((index, ftp_file))
+                    index += 1
+
+    def _connected(self):
+        return _Connected(self)
+
+    def _workers(self, work_queue: asyncio.Queue, signal):
+        return _Workers(self, work_queue, signal)
+
+    async def _acquire(self) -> AsyncFTPSession:
+        await self._sessions.acquire()
+        if self._idle:
+            return self._idle.pop()
+
+        session = AsyncFTPSession(self.url, self.port, self.timeout)
+        try:
+            with self.metrics.phase('connect'):
+                await session.connect(self.username, self.password)
+        except BaseException:
+            session.close()
+            self._sessions.release()
+            raise
+        return session
+
+    def _release(self, session: AsyncFTPSession, reusable: bool=True) -> None:
+        if reusable and self._idle is not None:
+            self._idle.append(session)
+        else:
+            session.close()
+        self._sessions.release()
+
+    async def _crawl_worker(self, dir_queue: asyncio.Queue, found_queue: asyncio.Queue) -> None:
+        while True:
+            ftp_path, local_path, depth = await dir_queue.get()
+            try:
+                dirs, files = await self._scan_ftp_dir(ftp_path, local_path)
+                for ftp_file in files:
+                    await found_queue.put(ftp_file)
+                if self.max_depth is None or depth < self.max_depth:
+                    for ftp_dir, local_dir, _ in dirs:
+                        if self._dir_check(ftp_dir):
+                            dir_queue.put_nowait((ftp_dir, local_dir, depth + 1))
+            except Exception as e:
+                logging.error(f'failed to list {ftp_path}: {e}')
+                await found_queue.put(e)
+            finally:
+                dir_queue.task_done()
+
+    async def _scan_ftp_dir(self, ftp_path: str, local_path: str) -> tuple:
+        """ :return: (list of (ftp_dir, local_dir, dir_mtime), list of FTPFile to download) """
+        session = await self._acquire()
+        reusable = False
+        try:
+            with self.metrics.phase('list'):
+                entries = await self._list_dir(session, ftp_path)
+
+            link_dirs = {
+                ftp_dir for ftp_dir in self._link_paths(ftp_path, entries)
+                if await self._is_ftp_dir(session, ftp_dir)}
+            dirs, files = self._split_listing(ftp_path, local_path, entries, link_dirs)
+            if self.sync:
+                files = [ftp_file for ftp_file in files if not ftp_file.is_up_to_date()]
+            reusable = True
+            return dirs, files
+        finally:
+            self._release(session, reusable)
+
+    async def _list_dir(self, session: AsyncFTPSession, ftp_path: str) -> list:
+        if self._use_mlsd:
+            try:
+                lines = await session.lines(f'MLSD {ftp_path}')
+                return [entry for entry in map(parse_mlsd_line, lines) if entry is not None]
+            except ftplib.error_perm as e:
+                if str(e)[:3] not in ('500', '502', '504'):
+                    raise
+                logging.info(f'MLSD is not supported by {self.url}, using LIST')
+                self._use_mlsd = False
+
+        entries = list()
+        for line in await session.lines(f'LIST {ftp_path}'):
+            entry = parse_list_line(line)
+            if entry is not None and entry.name not in ('.', '..'):
+                entries.append(entry)
+        return entries
+
+    async def _is_ftp_dir(self, session: AsyncFTPSession, ftp_path: str) -> bool:
+        # 상대 경로가 같은 디렉터리를 가리키도록 작업 디렉터리를 되돌림
+        original_cwd = await session.pwd()
+        try:
+            await session.command(f'CWD {ftp_path}')
+        except ftplib.error_perm:
+            return False
+        await session.command(f'CWD {original_cwd}')
+        return True
+
+    async def _download_worker(self, work_queue: asyncio.Queue, results: list, failed: list,
+                               signal) -> None:
+        session = None
+        try:
+            while True:
+                if session is not None and work_queue.empty():
+                    # 기다리는 동안 목록 조회가 세션을 쓸 수 있도록 반납
+                    self._release(session)
+                    session = None
+                item = await work_queue.get()
+                if item is None:
+                    break
+
+                index, ftp_file = item
+                attempt = 0
+                while True:
+                    try:
+                        if session is None:
+                            session = await self._acquire()
+                        await self._download_file(ftp_file, session)
+                    except Exception as e:
+                        if session is not None:
+                            self._release(session, reusable=False)
+                            session = None
+
+                        delay = self._retry_delay(ftp_file, e, attempt)
+                        if delay is None:
+                            failed.append((index, ftp_file))
+                            break
+
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                    else:
+                        ftp_file.error = None
+                        results.append((index, ftp_file))
+                        if signal:
+                            signal.emit(ftp_file)
+                        break
+        finally:
+            if session is not None:
+                self._release(session)
+
+    async def _download_file(self, ftp_file: FTPFile, session: AsyncFTPSession) -> None:
+        ftp_file.mkdir()
+        offset = self._partial_size(ftp_file) if self.resume else 0
+        size = ftp_file.size
+        if offset and size is None:
+            size = await session.size(ftp_file.ftp_path)
+        if size is not None and offset >= size:
+            # 크기만으로는 다 받은 파일인지 알 수 없으므로 처음부터 다시 받음
+            offset = 0
+
+        try:
+            if offset:
+                logging.info(f'resume {ftp_file} from {offset} bytes')
+                self.metrics.add_skipped(offset)
+            with self.metrics.phase('transfer'):
+                await self._retrieve(ftp_file, session, offset)
+
+            with self.metrics.phase('move'):
+                shutil.move(ftp_file.temp_path, ftp_file.local_path)
+            if ftp_file.mtime is not None:
+                os.utime(ftp_file.local_path, (ftp_file.mtime, ftp_file.mtime))
+            self.metrics.file_done(ftp_file.ftp_path)
+            logging.info(f'download file: {ftp_file.local_path}')
+        except Exception as e:
+            logging.error(f'failed to download {ftp_file}: {e}')
+            if not self.resume and os.path.exists(ftp_file.temp_path):
+                os.remove(ftp_file.temp_path)
+            raise
+
+    async def _retrieve(self, ftp_file: FTPFile, session: AsyncFTPSession, offset: int=0) -> None:
+        reader, writer = await session.transfer(f'RETR {ftp_file.ftp_path}', offset)
+        try:
+            # 작은 파일 위주이므로 페이지 캐시에 바로 기록, 기록한 만큼만 서버에서 읽음
+            with open(ftp_file.temp_path, 'ab' if offset else 'wb', buffering=0) as f:
+                while True:
+                    chunk = await asyncio.wait_for(reader.read(self.blocksize), self.timeout)
+                    if not chunk:
+                        break
+                    self._write_all(f, memoryview(chunk))
+                    self.metrics.add_bytes(ftp_file.ftp_path, len(chunk))
+        finally:
+            writer.close()
+        await session.reply('2')
+
+
+class _Connected:
+    """ connect for the duration of the block unless already connected """
+
+    def __init__(self, ftp_client: AsyncFTPClient):
+        self.ftp_client = ftp_client
+        self.owner = False
+
+    async def __aenter__(self):
+        if self.ftp_client._sessions is None:
+            self.owner = True
+            await self.ftp_client.connect()
+
+    async def __aexit__(self, *exc_info):
+        if self.owner:
+            await self.ftp_client.disconnect()
+
+
+class _Workers:
+    """
+    run download tasks consuming a work queue for the duration of the
+    block, then wait for the queue to drain
+    """
+
+    def __init__(self, ftp_client: AsyncFTPClient, work_queue: asyncio.Queue, signal):
+        self.ftp_client = ftp_client
+        self.work_queue = work_queue
+        self.signal = signal
+        self.results = list()
+        self.failed = list()
+        self.tasks = list()
+
+    async def __aenter__(self):
+        ftp_client = self.ftp_client
+        self.tasks = [
+            asyncio.ensure_future(ftp_client._download_worker(
+                self.work_queue, self.results, self.failed, self.signal))
+            for _ in range(max(1, ftp_client.workers))]
+
+    async def __aexit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            for _ in self.tasks:
+                await self.work_queue.put(None)
+            await asyncio.gather(*self.tasks)
+        else:
+            for task in self.tasks:
+                task.cancel()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+        ftp_client = self.ftp_client
+        # 완료 순서와 관계 없이 큐에 들어온 순서대로 결과 유지
+        ftp_client._file_downloaded.extend(
+            ftp_file for _, ftp_file in sorted(self.results, key=lambda result: result[0]))
+        ftp_client._file_failed.extend(
+            ftp_file for _, ftp_file in sorted(self.failed, key=lambda result: result[0]))
+        if ftp_client.failed_list is not None:
+            save_failed_files(ftp_client.failed_list, ftp_client._file_failed)
@@ -0,0 +1,160 @@
+import os
+import re
+import logging
+import posixpath
+
+from ftp.download_queue import DownloadQueue
+from ftp.ftp_file import FTPFile
+from ftp.matcher import PathMatcher
+from ftp.metrics import TransferMetrics
+from ftp.retry import RetryPolicy, load_failed_files
+
+
+class BaseFTPClient:
+    """
+    settings, filters and retry bookkeeping shared by FTPClient and
+    AsyncFTPClient, the subclasses only add the I/O
+    """
+    default_workers = 1
+
+    def __init__(self, url: str, username: str='ananoymous', password: str='anonymous@',
+                 port: int=21):
+        self.url = url
+        self.port = port
+        self.username = username
+        self.password = password
+        self.pattern = None
+        self.matcher = None
+        self.dir_filter = None
+        self.workers = self.default_workers
+        self.max_depth = None
+        self.resume = True
+        self.sync = False
+        self.order = None
+        self.blocksize = 64 * 1024
+        self.retry_policy = RetryPolicy()
+        self.failed_list = None
+        self.metrics = TransferMetrics()
+
+        self._use_mlsd = True
+        self._file_to_download = DownloadQueue()
+        self._file_downloaded = list()
+        self._file_failed = list()
+
+    @classmethod
+    def from_cfg(cls, ftp_cfg: dict):
+        """
+        create client from the keys of the `ftp` block both clients
+        understand, subclasses read their own keys on top
+
+        :param dict ftp_cfg: config data (see `get_cfg`)
+        """
+        ftp_client = cls(
+            ftp_cfg['url'], ftp_cfg['username'], ftp_cfg['password'], ftp_cfg.get('port', 21))
+        ftp_client.pattern = ftp_cfg.get('pattern')
+        if ftp_cfg.get('include') or ftp_cfg.get('exclude'):
+            ftp_client.matcher = PathMatcher(ftp_cfg.get('include'), ftp_cfg.get('exclude'))
+        ftp_client.workers = ftp_cfg.get('workers', cls.default_workers)
+        ftp_client.max_depth = ftp_cfg.get('max_depth')
+        ftp_client.resume = ftp_cfg.get('resume', True)
+        ftp_client.sync = ftp_cfg.get('sync', False)
+        ftp_client.order = ftp_cfg.get('order')
+        ftp_client.blocksize = ftp_cfg.get('blocksize', 64 * 1024)
+        ftp_client.retry_policy = RetryPolicy(
+            ftp_cfg.get('max_retries', 3), ftp_cfg.get('retry_delay', 1.0))
+        ftp_client.failed_list = ftp_cfg.get('failed_list')
+
+        return ftp_client
+
+    @property
+    def file_to_download(self) -> DownloadQueue:
+        return self._file_to_download
+
+    @property
+    def file_downloaded(self) -> list:
+        return self._file_downloaded
+
+    @property
+    def file_failed(self) -> list:
+        return self._file_failed
+
+    def load_failed(self) -> int:
+        """
+        queue the files recorded in `failed_list` by an earlier run,
+        without rescanning the server
+
+        :return: number of files queued
+        """
+        if self.failed_list is None:
+            return 0
+
+        return self._file_to_download.extend(load_failed_files(self.failed_list))
+
+    def _link_paths(self, ftp_path: str, entries: list) -> list:
+        """ :return: ftp paths of the symbolic links in a listing """
+        return [posixpath.join(ftp_path, entry.name) for entry in entries if entry.type == 'link']
+
+    def _split_listing(self, ftp_path: str, local_path: str, entries: list,
+                       link_dirs: set=frozenset()) -> tuple:
+        """
+        sort one directory listing into directories to descend into and
+        files passing `pattern` and `matcher`
+
+        :param set link_dirs: symbolic links (see `_link_paths`) pointing
+            to a directory, the other links are treated as files
+        :return: (list of (ftp_dir, local_dir, dir_mtime), list of FTPFile)
+        """
+        dirs = list()
+        files = list()
+        for entry in sorted(entries):
+            ftp_path_item = posixpath.join(ftp_path, entry.name)
+            local_path_item = os.path.join(local_path, entry.name)
+
+            if entry.type == 'dir' or ftp_path_item in link_dirs:
+                dirs.append((ftp_path_item, local_path_item, entry.mtime))
+            elif self._pattern_check(entry.name) and (
+                    self.matcher is None or self.matcher.match_file(ftp_path_item)):
+                files.append(FTPFile(ftp_path_item, local_path_item, entry.size, entry.mtime))
+
+        return dirs, files
+
+    def _retry_delay(self, ftp_file: FTPFile, error: Exception, attempt: int):
+        """
+        record a failed attempt on `ftp_file`
+
+        :param int attempt: number of retries already made
+        :return: seconds to wait before retrying, None to give up
+        """
+        ftp_file.error = f'{type(error).__name__}: {error}'
+        if not self.retry_policy.should_retry(error, attempt):
+            logging.error(f'giving up {ftp_file} after {attempt + 1} attempts')
+            return None
+
+        delay = self.retry_policy.delay(attempt)
+        logging.warning(f'retry {ftp_file} in {delay:.1f}s ({ftp_file.error})')
+        return delay
+
+    def _write_all(self, f, view: memoryview) -> None:
+        """ write `view` to an unbuffered file, which may accept only part of it per call """
+        written = 0
+        while written < len(view):
+            written += f.write(view[written:])
+
+    def _partial_size(self, ftp_file: FTPFile) -> int:
+        try:
+            return os.path.getsize(ftp_file.temp_path)
+        except OSError:
+            return 0
+
+    def _dir_check(self, ftp_path: str) -> bool:
+        if self.matcher is not None and not self.matcher.match_dir(ftp_path):
+            logging.debug(f'Skipping excluded directory: {ftp_path}')
+            return False
+
+        return self.dir_filter is None or self.dir_filter(ftp_path)
+
+    def _pattern_check(self, item):
+        if self.pattern is None or re.search(self.pattern, item):
+            return True
+
+        return False
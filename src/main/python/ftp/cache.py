@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from ftp.listing import FTPEntry
+
+
+class ListingCache:
+    """
+    persistent LRU cache of directory listings keyed by host + path
+
+    an entry is used while younger than `ttl`. After that it is still
+    used when the parent listing reports the same directory mtime, so
+    static archives are not listed again; a changed mtime always forces
+    a new listing. Note that a file rewritten in place does not change
+    its directory mtime, so `ttl` bounds how long such a change can go
+    unnoticed in directories without an mtime from the parent.
+    """
+
+    def __init__(self, path: str=None, ttl: float=3600, max_entries: int=100000):
+        """
+        :param str path: json file to load from and save to, None for memory only
+        :param float ttl: seconds a listing is trusted without revalidation
+        :param int max_entries: least recently used directories beyond this are dropped
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()   # key -> (cached_at, dir_mtime, entries)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def make_key(host: str, port: int, ftp_path: str) -> str:
+        return f'{host}:{port}{ftp_path.rstrip("/") or "/"}'
+
+    def get(self, key: str, dir_mtime: float=None):
+        """
+        :param float dir_mtime: directory mtime from the parent listing, if known
+        :return: list of FTPEntry or None when the directory must be listed
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+
+            cached_at, cached_mtime, entries = cached
+            if dir_mtime is not None and cached_mtime is not None and dir_mtime != cached_mtime:
+                return None
+
+            if time.time() - cached_at >= self.ttl:
+                if dir_mtime is None or cached_mtime is None:
+                    return None
+                # 디렉터리 수정 시각이 그대로이므로 목록을 다시 받지 않고 갱신
+                self._entries[key] = (time.time(), cached_mtime, entries)
+                self._dirty = True
+
+            self._entries.move_to_end(key)
+            return list(entries)
+
+    def put(self, key: str, entries: list, dir_mtime: float=None) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), dir_mtime, list(entries))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def invalidate(self, prefix: str=None) -> None:
+        """ drop every entry, or those whose key starts with `prefix` """
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key.startswith(prefix)]:
+                    del self._entries[key]
+            self._dirty = True
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f'ignoring listing cache {self.path}: {e}')
+            return
+
+        with self._lock:
+            self._entries = OrderedDict(
+                (key, (cached_at, dir_mtime, [FTPEntry(*entry) for entry in entries]))
+                for key, cached_at, dir_mtime, entries in data)
+            self._dirty = False
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            data = [
+                [key, cached_at, dir_mtime, [list(entry) for entry in entries]]
+                for key, (cached_at, dir_mtime, entries) in self._entries.items()]
+            self._dirty = False
+
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+
+_caches = dict()
+_caches_lock = threading.Lock()
+
+
+def get_listing_cache(path: str=None, ttl: float=3600, max_entries: int=100000) -> ListingCache:
+    """ cache shared by every client of the process using the same file """
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ListingCache(path, ttl, max_entries)
+        else:
+            cache.ttl = ttl
+            cache.max_entries = max_entries
+        return cache
@@ -0,0 +1,204 @@
+"""
+headless entry point: run config.yml jobs without Qt, jobs of a config run in parallel
+
+    python -m ftp config.yml [other.yml ...] [--watch SECONDS] [--retry-failed] [--json]
+"""
+import sys
+import json
+import asyncio
+import time
+import logging
+import argparse
+
+from ftp.aio import AsyncFTPClient
+from ftp.ftp_client import FTPClient
+from ftp.scheduler import JobScheduler
+from ftp.util import get_jobs, get_scheduler_cfg
+
+EXIT_OK = 0
+EXIT_FAILED_FILES = 1
+EXIT_ERROR = 2
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ftp', description='download ftp directories listed in config files')
+    parser.add_argument('configs', nargs='+', help='config file path (.yml)')
+    parser.add_argument(
+        '--watch', type=float, metavar='SECONDS',
+        help='run again every SECONDS (sync mode is on unless the config sets it)')
+    parser.add_argument(
+        '--pipeline', action='store_true',
+        help='start downloading while the remote listing is still running')
+    parser.add_argument(
+        '--retry-failed', action='store_true',
+        help='only download the files left in `failed_list` by an earlier run')
+    parser.add_argument(
+        '--asyncio', action='store_true',
+        help='use the asyncio client (passive mode, no segments/rate limits/verify/journal/post_process/sink)')
+    parser.add_argument(
+        '--json', action='store_true', help='print one json summary line per job run')
+    parser.add_argument('-v', '--verbose', action='store_true', help='debug logging')
+    return parser.parse_args(argv)
+
+
+def run_config(config_file: str, pipeline: bool=False, watch: bool=False,
+               retry_failed: bool=False, use_asyncio: bool=False) -> list:
+    """
+    run every job of one config file in parallel (see `JobScheduler`)
+
+    :return: summary dict per job
+    """
+    try:
+        jobs = get_jobs(config_file)
+        scheduler = JobScheduler.from_cfg(get_scheduler_cfg(config_file))
+    except Exception as e:
+        logging.exception(f'invalid config: {config_file}')
+        return [dict(config=config_file, found=0, downloaded=0, failed=0,
+                     status='error', error=str(e), elapsed=0)]
+
+    summaries = scheduler.run(
+        jobs, lambda ftp_cfg: run_job(
+            ftp_cfg, config_file, pipeline, watch, retry_failed, use_asyncio))
+    # run_job 은 예외를 요약으로 바꾸지만, 스케줄러에서 실패한 작업도 빠짐없이 보고
+    return [
+        summary or dict(config=config_file, job=job.get('name'), found=0, downloaded=0,
+                        failed=0, status='error', error='job did not run', elapsed=0)
+        for job, summary in zip(jobs, summaries)]
+
+
+def run_job(ftp_cfg: dict, config_file: str, pipeline: bool=False, watch: bool=False,
+            retry_failed: bool=False, use_asyncio: bool=False) -> dict:
+    """
+    run apply + download for one job
+
+    :param dict ftp_cfg: job config (see `get_jobs`)
+    :return: summary dict (`status` is 'ok', 'failed' or 'error')
+    """
+    summary = dict(
+        config=config_file, job=ftp_cfg.get('name'), found=0, downloaded=0, failed=0)
+    started = time.monotonic()
+    try:
+        if watch:
+            ftp_cfg.setdefault('sync', True)
+        summary['url'] = ftp_cfg['url']
+
+        ftp_dirs = list(zip(ftp_cfg['remote_dirs'], ftp_cfg['local_dirs']))
+        ftp_client = (AsyncFTPClient if use_asyncio else FTPClient).from_cfg(ftp_cfg)
+        if use_asyncio:
+            summary['found'] = asyncio.run(
+                _run_async(ftp_client, ftp_dirs, pipeline, retry_failed))
+        elif retry_failed:
+            summary['found'] = ftp_client.load_failed()
+            ftp_client.download()
+        elif pipeline:
+            found = _Counter()
+            ftp_client.mirror(ftp_dirs, found_signal=found)
+            summary['found'] = found.count
+        else:
+            for remote_dir, local_dir in ftp_dirs:
+                ftp_client.apply_file_to_download(remote_dir, local_dir)
+            summary['found'] = len(ftp_client.file_to_download)
+            ftp_client.download()
+
+        summary['downloaded'] = len(ftp_client.file_downloaded)
+        summary['failed'] = len(ftp_client.file_failed)
+        summary['status'] = 'failed' if summary['failed'] else 'ok'
+        summary['metrics'] = ftp_client.metrics.dump(ftp_cfg.get('metrics_file'))
+        if getattr(ftp_client, 'journal', None) is not None:
+            summary['journal'] = ftp_client.journal.counts()
+            ftp_client.journal.close()
+        if getattr(ftp_client, 'post_processor', None) is not None:
+            ftp_client.post_processor.close()
+            summary['post_processed'] = len(ftp_client.post_processor.results)
+            summary['post_process_failed'] = len(ftp_client.post_processor.errors)
+            if ftp_client.post_processor.errors and summary['status'] == 'ok':
+                summary['status'] = 'failed'
+    except Exception as e:
+        logging.exception(f'job failed: {config_file} {ftp_cfg.get("name")}')
+        summary['status'] = 'error'
+        summary['error'] = str(e)
+
+    summary['elapsed'] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr)
+
+    while True:
+        exit_code = EXIT_OK
+        for config_file in args.configs:
+            summaries = run_config(
+                config_file, args.pipeline, args.watch is not None, args.retry_failed,
+                args.asyncio)
+            for summary in summaries:
+                _report(summary, args.json)
+
+                if summary['status'] == 'error':
+                    exit_code = EXIT_ERROR
+                elif summary['status'] == 'failed':
+                    exit_code = max(exit_code, EXIT_FAILED_FILES)
+
+        if args.watch is None:
+            return exit_code
+
+        try:
+            time.sleep(args.watch)
+        except KeyboardInterrupt:
+            return exit_code
+
+
+async def _run_async(ftp_client: AsyncFTPClient, ftp_dirs: list, pipeline: bool,
+                     retry_failed: bool) -> int:
+    """ job body for the asyncio client, returns the number of files found """
+    await ftp_client.connect()
+    try:
+        if retry_failed:
+            found = ftp_client.load_failed()
+            await ftp_client.download()
+        elif pipeline:
+            counter = _Counter()
+            await ftp_client.mirror(ftp_dirs, found_signal=counter)
+            found = counter.count
+        else:
+            for remote_dir, local_dir in ftp_dirs:
+                await ftp_client.apply_file_to_download(remote_dir, local_dir)
+            found = len(ftp_client.file_to_download)
+            await ftp_client.download()
+    finally:
+        await ftp_client.disconnect()
+
+    return found
+
+
+def _report(summary: dict, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(summary), flush=True)
+    else:
+        metrics = summary.get('metrics', {})
+        name = summary['config']
+        if summary.get('job'):
+            name = f"{name} ({summary['job']})"
+        print(
+            f"[{summary['status']}] {name}: "
+            f"found {summary['found']}, downloaded {summary['downloaded']}, "
+            f"failed {summary['failed']}, {metrics.get('bytes_done', 0)} bytes "
+            f"({summary['elapsed']}s, {metrics.get('average_throughput', 0) / 2**20:.2f} MiB/s)"
+            + (f", post processed {summary['post_processed']} "
+               f"(failed {summary['post_process_failed']})" if 'post_processed' in summary else ''),
+            flush=True)
+
+
+class _Counter:
+    """ signal stand-in that counts emitted files """
+
+    def __init__(self):
+        self.count = 0
+
+    def emit(self, ftp_file) -> None:
+        self.count += 1
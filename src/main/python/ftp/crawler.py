@@ -0,0 +1,117 @@
+import queue
+import logging
+import threading
+
+
+class FTPCrawler:
+    """ breadth-first remote tree walker over a pool of ftp sessions """
+
+    def __init__(self, ftp_client, workers: int=1, max_depth: int=None, dir_filter=None):
+        """
+        :param FTPClient ftp_client: client used to open sessions and list directories
+        :param int workers: number of concurrent listing sessions
+        :param int max_depth: deepest directory level to list (root is 0), None for no limit
+        :param dir_filter: callable(ftp_path) -> bool, False prunes the subtree before listing
+        """
+        self.ftp_client = ftp_client
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.dir_filter = dir_filter
+
+    def walk(self, ftp_dir: str, local_dir: str):
+        """
+        yield FTPFile objects as soon as they are discovered
+
+        :param str ftp_dir: remote root directory
+        :param str local_dir: local directory matched to `ftp_dir`
+        """
+        dir_queue = queue.Queue()
+        found_queue = queue.Queue()
+        stop_event = threading.Event()
+        state = {'pending': 1}
+        lock = threading.Lock()
+
+        dir_queue.put((ftp_dir, local_dir, 0, None))
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(dir_queue, found_queue, stop_event, state, lock),
+                daemon=True)
+            for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = found_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop_event.set()
+            for _ in threads:
+                dir_queue.put(None)
+            for thread in threads:
+                thread.join()
+
+    def _worker(self, dir_queue, found_queue, stop_event, state, lock):
+        ftp_handler = None
+        reusable = True
+
+        def get_handler():
+            # 목록 캐시를 쓰면 세션이 필요 없을 수도 있으므로 처음 필요할 때 연결
+            nonlocal ftp_handler
+            if ftp_handler is None:
+                ftp_handler = self.ftp_client._new_handler()
+            return ftp_handler
+
+        try:
+            while not stop_event.is_set():
+                item = dir_queue.get()
+                if item is None:
+                    break
+
+                ftp_path, local_path, depth, dir_mtime = item
+                try:
+                    # 일시 정지 중이면 대기, 취소되면 DownloadCancelled 를 walk 로 전달
+                    self.ftp_client._checkpoint()
+                    dirs, files = self.ftp_client._scan_ftp_dir(
+                        ftp_path, local_path, get_handler, dir_mtime)
+                except Exception as e:
+                    if self.ftp_client.cancelled:
+                        logging.info(f'scan cancelled at {ftp_path}')
+                    else:
+                        logging.error(f'failed to list {ftp_path}: {e}')
+                    reusable = False
+                    found_queue.put(e)
+                    break
+
+                for ftp_file in files:
+                    found_queue.put(ftp_file)
+
+                if self.max_depth is None or depth < self.max_depth:
+                    dirs = [
+                        (ftp_dir, local_dir, depth + 1, mtime) for ftp_dir, local_dir, mtime in dirs
+                        if self.dir_filter is None or self.dir_filter(ftp_dir)]
+                else:
+                    dirs = []
+
+                with lock:
+                    state['pending'] += len(dirs) - 1
+                    finished = state['pending'] == 0
+                for next_item in dirs:
+                    dir_queue.put(next_item)
+
+                if finished:
+                    found_queue.put(None)
+
+                if ftp_handler is not None and self.ftp_client._session_slots is not None \
+                        and dir_queue.empty():
+                    # mirror 중에는 기다리는 동안 다운로드가 세션을 쓸 수 있도록 반납
+                    self.ftp_client._close_handler(ftp_handler)
+                    ftp_handler = None
+        finally:
+            if ftp_handler is not None:
+                self.ftp_client._close_handler(ftp_handler, reusable)
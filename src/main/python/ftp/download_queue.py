@@ -0,0 +1,105 @@
+import heapq
+import itertools
+from collections import deque
+
+from ftp.ftp_file import FTPFile
+
+
+def _size_key(ftp_file: FTPFile, largest_first: bool) -> tuple:
+    # 크기를 모르는 파일은 마지막에 받음
+    size = ftp_file.size or 0
+    return ftp_file.size is None, -size if largest_first else size
+
+
+def _mtime_key(ftp_file: FTPFile, newest_first: bool) -> tuple:
+    mtime = ftp_file.mtime or 0
+    return ftp_file.mtime is None, -mtime if newest_first else mtime
+
+
+def _directory_key(ftp_file: FTPFile) -> tuple:
+    directory, _, name = ftp_file.ftp_path.rpartition('/')
+    return directory, name
+
+
+ORDERS = {
+    'smallest_first': lambda f: _size_key(f, False),
+    'largest_first': lambda f: _size_key(f, True),
+    'oldest_first': lambda f: _mtime_key(f, False),
+    'newest_first': lambda f: _mtime_key(f, True),
+    'directory': _directory_key,
+}
+
+
+class DownloadQueue:
+    """
+    queue of FTPFile waiting for download, deduplicated by remote path
+
+    files come out in insertion order, or by `order` (see ORDERS) using a
+    heap; ties keep insertion order. push and pop are O(1) / O(log n).
+    """
+
+    def __init__(self, order: str=None):
+        self._key = None
+        self._fifo = deque()
+        self._heap = list()
+        self._queued = set()    # 대기 중인 파일의 ftp_path
+        self._counter = itertools.count()
+        self.order = order
+
+    @property
+    def order(self) -> str:
+        return self._order
+
+    @order.setter
+    def order(self, order: str) -> None:
+        if order is not None and order not in ORDERS:
+            raise ValueError(f'unknown order {order!r}, expected one of {", ".join(ORDERS)}')
+
+        ftp_files = list(self)
+        self._order = order
+        self._key = ORDERS.get(order)
+        self._fifo.clear()
+        self._heap.clear()
+        self._queued.clear()
+        self.extend(ftp_files)
+
+    def push(self, ftp_file: FTPFile) -> bool:
+        """ :return: False when the remote path is already queued """
+        if ftp_file.ftp_path in self._queued:
+            return False
+
+        self._queued.add(ftp_file.ftp_path)
+        if self._key is None:
+            self._fifo.append(ftp_file)
+        else:
+            heapq.heappush(self._heap, (self._key(ftp_file), next(self._counter), ftp_file))
+        return True
+
+    def extend(self, ftp_files) -> int:
+        """ :return: number of files actually queued """
+        return sum(self.push(ftp_file) for ftp_file in ftp_files)
+
+    def pop(self) -> FTPFile:
+        if self._key is None:
+            ftp_file = self._fifo.popleft()
+        else:
+            ftp_file = heapq.heappop(self._heap)[-1]
+        self._queued.discard(ftp_file.ftp_path)
+        return ftp_file
+
+    def clear(self) -> None:
+        self._fifo.clear()
+        self._heap.clear()
+        self._queued.clear()
+
+    def __contains__(self, ftp_path: str) -> bool:
+        return ftp_path in self._queued
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __iter__(self):
+        """ iterate in download order without consuming the queue """
+        if self._key is None:
+            return iter(list(self._fifo))
+        return (item[-1] for item in sorted(self._heap))
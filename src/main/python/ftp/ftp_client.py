@@ -1,33 +1,121 @@
 import os
-import re
+import json
+import queue
+import time
 import shutil
+import contextlib
 import ftplib
 import logging
-import posixpath
+import threading
 
+from ftp.base import BaseFTPClient
+from ftp.cache import ListingCache, get_listing_cache
+from ftp.crawler import FTPCrawler
 from ftp.ftp_file import FTPFile
+from ftp.listing import MlsdUnsupported, list_dir
+from ftp.journal import JobJournal, QUEUED, IN_PROGRESS, DONE, FAILED
+from ftp.pool import default_pool
+from ftp.postprocess import PostProcessor
+from ftp.sink import get_sink
+from ftp.ratelimit import shared_bucket
+from ftp.retry import save_failed_files
+from ftp.util import parse_ftp_time
+from ftp.verify import (
+    HASH_ALGORITHMS, ChecksumError, StreamHasher, remote_checksum, sidecar_checksum)
 
 
-class FTPClient:
+class DownloadCancelled(Exception):
+    """ raised inside scans and transfers once `FTPClient.cancel` is called """
 
-    def __init__(self, url: str, username: str='ananoymous', password: str='anonymous@'):
-        self.url = url
-        self.username = username
-        self.password = password
-        self.pattern = None
+
+class FTPClient(BaseFTPClient):
+
+    def __init__(self, url: str, username: str='ananoymous', password: str='anonymous@',
+                 port: int=21):
+        super().__init__(url, username, password, port)
+        self.segment_threshold = None
+        self.segment_count = 4
+        self.pool = default_pool
+        self.progress_callback = None
+        self.progress_interval = 0.5
+        self.rate_limit = None
+        self.host_rate_limit = None
+        self.preallocate = False
+        self.verify = list()
+        self.checksum_source = None
+        self.manifest = None
+        self.listing_cache = None
+        self.journal = None
+        self.post_processor = None
+        self.sink = None
 
         self._passive_mode = True
         self._ftp_handler = None
-        self._file_to_download = list()
-        self._file_downloaded = list()
+        self._last_progress = 0.0
+        self._buckets = list()
+        self._manifest_records = list()
+        self._manifest_lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._session_slots = None
+        self._slot_holders = dict()     # ftp_handler -> semaphore it holds a slot of
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+
+    @classmethod
+    def from_cfg(cls, ftp_cfg: dict) -> 'FTPClient':
+        """
+        create client from the `ftp` block of config.yml
+
+        :param dict ftp_cfg: config data (see `get_cfg`)
+        """
+        ftp_client = super().from_cfg(ftp_cfg)
+        if ftp_cfg.get('passive_mode', True):
+            ftp_client.set_passive_mode()
+        else:
+            ftp_client.set_active_mode()
+        ftp_client.segment_threshold = ftp_cfg.get('segment_threshold')
+        ftp_client.segment_count = ftp_cfg.get('segment_count', 4)
+        ftp_client.rate_limit = ftp_cfg.get('rate_limit')
+        ftp_client.host_rate_limit = ftp_cfg.get('host_rate_limit')
+        ftp_client.preallocate = ftp_cfg.get('preallocate', False)
+        ftp_client.verify = ftp_cfg.get('verify', [])
+        ftp_client.checksum_source = ftp_cfg.get('checksum_source')
+        ftp_client.manifest = ftp_cfg.get('manifest')
+        if ftp_cfg.get('listing_cache'):
+            ftp_client.listing_cache = get_listing_cache(
+                ftp_cfg['listing_cache'], ftp_cfg.get('listing_cache_ttl', 3600))
+        if ftp_cfg.get('journal'):
+            ftp_client.journal = JobJournal(ftp_cfg['journal'])
+        if ftp_cfg.get('post_process'):
+            ftp_client.post_processor = PostProcessor.from_cfg(ftp_cfg)
+        ftp_client.sink = get_sink(ftp_cfg.get('sink'))
+
+        return ftp_client
 
     @property
-    def file_to_download(self) -> list:
-        return self._file_to_download
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
 
     @property
-    def file_downloaded(self) -> list:
-        return self._file_downloaded
+    def paused(self) -> bool:
+        return not self._unpaused.is_set()
+
+    def cancel(self) -> None:
+        """
+        stop scanning and downloading as soon as possible: transfers in
+        flight are aborted with ABOR keeping their partial file for resume,
+        and files not finished go back to `file_to_download`
+        """
+        self._cancel_event.set()
+        # 일시 정지 중인 작업자도 깨워서 종료
+        self._unpaused.set()
+
+    def pause(self) -> None:
+        """ hold every scan and transfer after its current block until `unpause` """
+        self._unpaused.clear()
+
+    def unpause(self) -> None:
+        self._unpaused.set()
 
     def set_active_mode(self) -> None:
         self._passive_mode = False
@@ -36,101 +124,632 @@ class FTPClient:
         self._passive_mode = True
 
     def download(self, signal=None) -> None:
-        self._connect()
+        """
+        download every queued file using `workers` concurrent ftp sessions
+
+        :param signal: object with `emit(ftp_file)`, called per completed file
+        """
+        self._cancel_event.clear()
+        self._file_to_download.order = self.order
 
-        # TODO: 다운로드 실패한 파일에 대한 처리 필요
+        work_queue = queue.Queue()
+        index = 0
         while self._file_to_download:
-            ftp_file = self._file_to_download.pop(0)
-            if self._download_file(ftp_file):
-                self._file_downloaded.append(ftp_file)
-                if signal:
-                    signal.emit(ftp_file)
-
-        self._disconnect()
-        
-    def _download_file(self, ftp_file: FTPFile) -> bool:
-        ftp_file.mkdir()
-        # TODO: 프로그레스바를 총 용량 대비로 해도 좋을 듯
+            ftp_file = self._file_to_download.pop()
+            self.metrics.add_expected(ftp_file.size)
+            work_queue.put((index, ftp_file))
+            index += 1
+
+        worker_count = max(1, min(self.workers, work_queue.qsize()))
+        with self._workers(worker_count, work_queue, signal):
+            # 큐가 이미 채워져 있으므로 작업자가 모두 끝나기만 기다림
+            pass
+
+    def mirror(self, ftp_dirs, signal=None, found_signal=None) -> None:
+        """
+        scan and download at the same time: files start downloading as
+        soon as the crawler discovers them. Listing and download sessions
+        share the `workers` budget, idle ones hand their slot back
+
+        :param ftp_dirs: iterable of (ftp_dir, local_dir)
+        :param signal: object with `emit(ftp_file)`, called per completed file
+        :param found_signal: object with `emit(ftp_file)`, called per discovered file
+        """
+        self._cancel_event.clear()
+        work_queue = queue.Queue()
+        index = 0
+        seen = set()    # 겹치는 remote_dirs 에서 같은 파일을 두 번 받지 않도록
+        self._session_slots = threading.BoundedSemaphore(max(1, self.workers))
+        try:
+            with self._workers(self.workers, work_queue, signal):
+                try:
+                    for ftp_dir, local_dir in ftp_dirs:
+                        for ftp_file in self.iter_file_to_download(ftp_dir, local_dir):
+                            if ftp_file.ftp_path in seen:
+                                continue
+                            seen.add(ftp_file.ftp_path)
+                            if found_signal:
+                                found_signal.emit(ftp_file)
+                            self.metrics.add_expected(ftp_file.size)
+                            work_queue.put((index, ftp_file))
+                            index += 1
+                except DownloadCancelled:
+                    logging.info('scan cancelled')
+        finally:
+            self._session_slots = None
+
+    @contextlib.contextmanager
+    def _workers(self, worker_count: int, work_queue: queue.Queue, signal):
+        """
+        run download workers consuming `work_queue` for the duration of the
+        block, then wait for the queue to drain
+        """
+        self._buckets = list()
+        if self.rate_limit:
+            self._buckets.append(shared_bucket('*', self.rate_limit))
+        if self.host_rate_limit:
+            self._buckets.append(shared_bucket(self.url, self.host_rate_limit))
+
+        results = list()
+        failed = list()
+        cancelled = list()
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self._download_worker,
+                args=(work_queue, results, failed, cancelled, lock, signal),
+                daemon=True)
+            for _ in range(worker_count)]
+
+        for thread in threads:
+            thread.start()
+        try:
+            yield
+        finally:
+            for _ in threads:
+                work_queue.put(None)
+            for thread in threads:
+                thread.join()
+
+            # 완료 순서와 관계 없이 큐에 들어온 순서대로 결과 유지
+            results.sort(key=lambda result: result[0])
+            self._file_downloaded.extend(ftp_file for _, ftp_file in results)
+
+            failed.sort(key=lambda result: result[0])
+            self._file_failed.extend(ftp_file for _, ftp_file in failed)
+
+            if cancelled:
+                # 다시 download 하면 남은 파일부터 이어서 받음
+                cancelled.sort(key=lambda result: result[0])
+                self._file_to_download.extend(ftp_file for _, ftp_file in cancelled)
+                logging.info(f'cancelled, {len(cancelled)} files left to download')
+            if self.failed_list is not None:
+                save_failed_files(self.failed_list, self._file_failed)
+            if self.manifest is not None:
+                self._write_manifest()
+            if self.journal is not None:
+                self.journal.flush()
+            if self.post_processor is not None:
+                self.post_processor.wait()
+
+    def _download_worker(self, work_queue, results, failed, cancelled, lock, signal) -> None:
+        ftp_handler = None
         try:
-            with open(ftp_file.temp_path, 'wb') as f:
-                self._ftp_handler.retrbinary(
-                    f'RETR {ftp_file.ftp_path}', f.write)
+            while True:
+                if ftp_handler is not None and self._session_slots is not None \
+                        and work_queue.empty():
+                    # 기다리는 동안 목록 조회가 세션을 쓸 수 있도록 반납
+                    self._close_handler(ftp_handler)
+                    ftp_handler = None
+                item = work_queue.get()
+                if item is None:
+                    break
+
+                index, ftp_file = item
+                if self._cancel_event.is_set():
+                    with lock:
+                        cancelled.append(item)
+                    continue
+
+                attempt = 0
+                while True:
+                    try:
+                        if ftp_handler is None:
+                            ftp_handler = self._new_handler()
+                        self._download_file(ftp_file, ftp_handler)
+                    except Exception as e:
+                        # 실패 원인이 세션일 수 있으므로 다시 받을 때는 새 세션 사용
+                        if ftp_handler is not None:
+                            self._close_handler(ftp_handler, reusable=False)
+                            ftp_handler = None
+
+                        if isinstance(e, DownloadCancelled):
+                            with lock:
+                                cancelled.append(item)
+                            break
+
+                        delay = self._retry_delay(ftp_file, e, attempt)
+                        if delay is None:
+                            with lock:
+                                failed.append((index, ftp_file))
+                            if self.journal is not None:
+                                self.journal.record(ftp_file, FAILED)
+                            break
+
+                        if self._cancel_event.wait(delay):
+                            with lock:
+                                cancelled.append(item)
+                            break
+                        attempt += 1
+                    else:
+                        ftp_file.error = None
+                        with lock:
+                            results.append((index, ftp_file))
+                        if self.journal is not None:
+                            self.journal.record(ftp_file, DONE, offset=ftp_file.size)
+                        if self.post_processor is not None and (
+                                self.sink is None or self.sink.local_files):
+                            # 풀이 가득 차 있으면 여기서 대기, 처리는 다음 전송과 겹쳐서 진행
+                            try:
+                                self.post_processor.submit(ftp_file.local_path)
+                            except Exception as e:
+                                # 풀이 깨져도 (BrokenProcessPool 등) 남은 파일은 계속 받음
+                                self.post_processor.add_error(ftp_file.local_path, e)
+                        if signal:
+                            signal.emit(ftp_file)
+                        break
+        finally:
+            if ftp_handler is not None:
+                self._close_handler(ftp_handler)
+
+    def _download_file(self, ftp_file: FTPFile, ftp_handler: ftplib.FTP) -> None:
+        self._checkpoint()
+        # sink 는 첫 바이트부터 스트림을 받으므로 이어받기/분할 다운로드 하지 않음
+        streaming = self.sink is not None
+        if not streaming:
+            ftp_file.mkdir()
+        keep_partial = self.resume and not streaming
+        segmented = not streaming and self.segment_threshold is not None and self.segment_count > 1
+        algorithms = [name for name in self.verify if name in HASH_ALGORITHMS]
+        hasher = StreamHasher(algorithms) if algorithms else None
+        writer = None
+        try:
+            offset = self._partial_size(ftp_file) if keep_partial else 0
+
+            size = ftp_file.size
+            if size is None and (offset or (self.preallocate and not streaming) or segmented):
+                size = self._remote_size(ftp_file.ftp_path, ftp_handler)
+
+            if size is not None and offset >= size:
+                # 원격 파일이 바뀌었거나 다 받은 뒤 이름을 바꾸기 전에 중단된 경우,
+                # 크기만으로는 내용을 믿을 수 없으므로 처음부터 다시 받음
+                offset = 0
+            if self.journal is not None:
+                self.journal.record(ftp_file, IN_PROGRESS, offset=offset)
+
+            data_path = ftp_file.temp_path
+            if streaming:
+                # 임시 파일을 거치지 않고 받은 블록을 그대로 sink 에 전달
+                writer = self.sink.open(ftp_file)
+                with self.metrics.phase('transfer'):
+                    local_size = self._retrieve(ftp_file, ftp_handler, writer, 0, hasher)
+            elif offset == 0 and size is not None and segmented and size >= self.segment_threshold:
+                # 구간별로 받은 파일은 앞부분부터 채워지지 않으므로 .seg 에 받고 이어받지 않음
+                data_path = ftp_file.segment_path
+                if os.path.exists(ftp_file.temp_path):
+                    os.remove(ftp_file.temp_path)
+                with self.metrics.phase('transfer'):
+                    self._download_segmented(ftp_file, size)
+                # 모든 구간이 정해진 길이를 다 받아야 끝나므로 받은 크기는 원격 크기와 같음
+                local_size = size
+                if hasher:
+                    # 구간이 순서대로 도착하지 않으므로 분할 다운로드만 한 번 더 읽음
+                    hasher.update_from_file(data_path)
+            else:
+                if offset:
+                    logging.info(f'resume {ftp_file} from {offset} bytes')
+                    self.metrics.add_skipped(offset)
+                    if hasher:
+                        hasher.update_from_file(ftp_file.temp_path, offset)
+                # 버퍼 없이 쓰기: recv_into 로 받은 memoryview 를 그대로 파일에 기록
+                with open(ftp_file.temp_path, 'ab' if offset else 'wb', buffering=0) as f, \
+                        self.metrics.phase('transfer'):
+                    preallocated = size and not offset and not self.resume
+                    if preallocated:
+                        # 이어받기 중에는 임시 파일 크기로 받은 위치를 판단하므로 미리 할당하지 않음
+                        self._preallocate(f, size)
+                    # 미리 할당하면 파일 크기가 원격 크기와 같아지므로 받은 바이트 수로 검증
+                    local_size = offset + self._retrieve(ftp_file, ftp_handler, f, offset, hasher)
+                    if preallocated and local_size < size:
+                        f.truncate(local_size)
 
-            shutil.move(ftp_file.temp_path, ftp_file.local_path)
-            print('download file:', ftp_file.local_path)
+            record = None
+            if self.verify:
+                with self.metrics.phase('verify'):
+                    record = self._verify(ftp_file, ftp_handler, size, hasher, local_size)
+
+            with self.metrics.phase('move'):
+                if writer is not None:
+                    writer.commit()
+                    writer = None
+                else:
+                    shutil.move(data_path, ftp_file.local_path)
+            if record is not None:
+                with self._manifest_lock:
+                    self._manifest_records.append(record)
+            if ftp_file.mtime is not None and not streaming:
+                # 동기화 모드에서 비교할 수 있도록 원격 수정 시각을 그대로 기록
+                os.utime(ftp_file.local_path, (ftp_file.mtime, ftp_file.mtime))
+            self.metrics.file_done(ftp_file.ftp_path)
+            self._report_progress(ftp_file, force=True)
+            logging.info(f'download file: {ftp_file.local_path}')
         except Exception as e:
-            print(e)
-            return False
+            if isinstance(e, DownloadCancelled):
+                logging.info(f'cancelled {ftp_file}')
+            else:
+                logging.error(f'failed to download {ftp_file}: {e}')
+            if isinstance(e, ChecksumError):
+                # 손상된 데이터는 이어받지 않음
+                keep_partial = False
+            if writer is not None:
+                writer.abort()
+            elif not streaming:
+                if not keep_partial and os.path.exists(ftp_file.temp_path):
+                    os.remove(ftp_file.temp_path)
+                if os.path.exists(ftp_file.segment_path):
+                    os.remove(ftp_file.segment_path)
+            raise
+
+    def _retrieve(self, ftp_file: FTPFile, ftp_handler: ftplib.FTP, f, offset: int=0,
+                  hasher: StreamHasher=None) -> int:
+        """
+        RETR into an unbuffered file or sink writer, reading the data socket
+        into one reusable buffer instead of allocating a bytes object per block
+
+        :return: number of bytes received
+        """
+        buffer = bytearray(self.blocksize)
+        view = memoryview(buffer)
+        received = 0
+
+        ftp_handler.voidcmd('TYPE I')
+        with ftp_handler.transfercmd(f'RETR {ftp_file.ftp_path}', offset or None) as conn:
+            try:
+                while True:
+                    size = conn.recv_into(buffer)
+                    if not size:
+                        break
+                    self._write_all(f, view[:size])
+                    if hasher:
+                        hasher.update(view[:size])
+                    received += size
+                    self._on_chunk(ftp_file, size)
+            except DownloadCancelled:
+                self._abort(ftp_handler)
+                raise
+
+        ftp_handler.voidresp()
+        return received
+
+    def _verify(self, ftp_file: FTPFile, ftp_handler: ftplib.FTP, size, hasher,
+                local_size: int) -> dict:
+        """
+        check the downloaded data against the remote size and checksums
+
+        :param int local_size: bytes received (and resumed), not the size on disk
+        :return: manifest record
+        :raise ChecksumError: mismatch
+        """
+        if 'size' in self.verify:
+            if size is None:
+                size = self._remote_size(ftp_file.ftp_path, ftp_handler)
+            if size is not None and size != local_size:
+                raise ChecksumError(f'{ftp_file}: size {local_size} != remote {size}')
+
+        digests = hasher.hexdigests() if hasher else dict()
+        verified = list()
+        for algorithm, digest in digests.items():
+            if self.checksum_source == 'server':
+                expected = remote_checksum(ftp_handler, ftp_file.ftp_path, algorithm)
+            elif self.checksum_source == 'sidecar':
+                expected = sidecar_checksum(ftp_handler, ftp_file.ftp_path, algorithm)
+            else:
+                expected = None
+
+            if expected is None:
+                continue
+            if expected != digest:
+                raise ChecksumError(f'{ftp_file}: {algorithm} {digest} != remote {expected}')
+            verified.append(algorithm)
+
+        return dict(
+            ftp_path=ftp_file.ftp_path, local_path=ftp_file.local_path,
+            size=local_size, verified=verified, **digests)
+
+    def _write_manifest(self) -> None:
+        with self._manifest_lock:
+            records = list(self._manifest_records)
+
+        temp_path = f'{self.manifest}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(records, f, indent=2)
+        os.replace(temp_path, self.manifest)
+
+    def _preallocate(self, f, size: int) -> None:
+        if not self.preallocate or not hasattr(os, 'posix_fallocate'):
+            return
+
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError as e:
+            # 파일 시스템이 지원하지 않으면 무시
+            logging.debug(f'posix_fallocate failed: {e}')
+
+    def _checkpoint(self) -> None:
+        """ wait while paused, raise DownloadCancelled once cancelled """
+        self._unpaused.wait()
+        if self._cancel_event.is_set():
+            raise DownloadCancelled()
+
+    def _abort(self, ftp_handler: ftplib.FTP) -> None:
+        # 데이터 연결 중단 요청, 세션은 재사용하지 않으므로 응답 오류는 무시
+        try:
+            ftp_handler.abort()
+        except (*ftplib.all_errors, AttributeError):
+            pass
+
+    def _on_chunk(self, ftp_file: FTPFile, size: int) -> None:
+        self._checkpoint()
+        self.metrics.add_bytes(ftp_file.ftp_path, size)
+        self._report_progress(ftp_file)
+        if self.journal is not None:
+            self.journal.add_bytes(ftp_file.ftp_path, size)
+        for bucket in self._buckets:
+            bucket.consume(size)
+
+    def _report_progress(self, ftp_file: FTPFile, force: bool=False) -> None:
+        if self.progress_callback is None:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        self.progress_callback(ftp_file, self.metrics.snapshot())
+
+    def _download_segmented(self, ftp_file: FTPFile, size: int) -> None:
+        """
+        download one file as `segment_count` byte ranges in parallel,
+        each range written at its own offset of a preallocated `.seg` file,
+        the first failing range stops the others
+        """
+        with open(ftp_file.segment_path, 'wb') as f:
+            f.truncate(size)
+            self._preallocate(f, size)
+
+        segment_size = -(-size // self.segment_count)
+        errors = list()
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._download_segment,
+                args=(ftp_file, offset, min(segment_size, size - offset), errors, stop),
+                daemon=True)
+            for offset in range(0, size, segment_size)]
+
+        logging.debug(f'segmented download: {ftp_file} ({len(threads)} segments)')
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def _download_segment(self, ftp_file: FTPFile, offset: int, length: int, errors: list,
+                          stop: threading.Event) -> None:
+        ftp_handler = None
+        try:
+            if stop.is_set():
+                return
+            # 작업자가 이미 자리를 차지하고 있으므로 세션 예산에서 제외
+            ftp_handler = self._new_handler(budgeted=False)
+            ftp_handler.voidcmd('TYPE I')
+            conn = ftp_handler.transfercmd(f'RETR {ftp_file.ftp_path}', rest=offset)
+            buffer = bytearray(self.blocksize)
+            view = memoryview(buffer)
+            with conn, open(ftp_file.segment_path, 'r+b', buffering=0) as f:
+                f.seek(offset)
+                remaining = length
+                while remaining:
+                    if stop.is_set():
+                        # 다른 구간이 실패해 어차피 다시 받아야 하므로 중단
+                        return
+                    size = conn.recv_into(view[:min(self.blocksize, remaining)])
+                    if not size:
+                        raise EOFError(f'segment {offset} of {ftp_file} ended early')
+                    self._write_all(f, view[:size])
+                    self._on_chunk(ftp_file, size)
+                    remaining -= size
+        except Exception as e:
+            if isinstance(e, DownloadCancelled):
+                self._abort(ftp_handler)
+            errors.append(e)
+            stop.set()
         finally:
-            if os.path.exists(ftp_file.temp_path):
-                os.remove(ftp_file.temp_path)
+            # 범위만 받고 데이터 연결을 끊었으므로 세션은 재사용하지 않음
+            if ftp_handler is not None:
+                self._close_handler(ftp_handler, reusable=False)
+
+    def _remote_mtime(self, ftp_path: str, ftp_handler: ftplib.FTP):
+        try:
+            resp = ftp_handler.voidcmd(f'MDTM {ftp_path}')
+            return parse_ftp_time(resp.split()[-1])
+        except (ftplib.error_perm, ValueError):
+            return None
+
+    def _remote_size(self, ftp_path: str, ftp_handler: ftplib.FTP):
+        try:
+            ftp_handler.voidcmd('TYPE I')
+            return ftp_handler.size(ftp_path)
+        except ftplib.error_perm:
+            return None
+
+    def apply_file_to_download(self, ftp_dir: str, local_dir: str='.') -> int:
+        """
+        :return: number of files queued, files already queued are skipped
+        :raise DownloadCancelled: `cancel` was called during the scan
+        """
+        self._cancel_event.clear()
+        return self._file_to_download.extend(self.iter_file_to_download(ftp_dir, local_dir))
 
-        return True
+    def iter_file_to_download(self, ftp_dir: str, local_dir: str='.'):
+        """
+        walk `ftp_dir` breadth-first, yielding FTPFile as they are discovered
 
-    def apply_file_to_download(self, ftp_dir: str, local_dir: str='.') -> list:
-        self._connect()
+        with a `journal`, the unfinished files of an interrupted run are
+        yielded instead when `ftp_dir` was completely listed before
+        """
+        if self.journal is None:
+            yield from self._walk(ftp_dir, local_dir)
+            return
 
-        local_dir_abs = os.path.abspath(local_dir)
-        self._mirror_ftp_dir(ftp_dir, local_dir)
+        ftp_files = self.journal.unfinished(ftp_dir)
+        if ftp_files is not None:
+            logging.info(f'resume {len(ftp_files)} files of {ftp_dir} from journal')
+            yield from ftp_files
+            return
 
-        self._disconnect()
+        done = self.journal.start_listing(ftp_dir)
+        for ftp_file in self._walk(ftp_dir, local_dir):
+            if done.get(ftp_file.ftp_path) == (ftp_file.size, ftp_file.mtime) \
+                    and os.path.exists(ftp_file.local_path):
+                # 목록 조회 중에 중단된 지난 실행에서 이미 받은 파일
+                continue
+            self.journal.record(ftp_file, QUEUED, root=ftp_dir)
+            yield ftp_file
+        self.journal.finish_listing(ftp_dir)
 
-    def append_ftp_file(self, ftp_file: FTPFile) -> None:
-        self._file_to_download.append(ftp_file)
+    def _walk(self, ftp_dir: str, local_dir: str):
+        crawler = FTPCrawler(self, self.workers, self.max_depth, self._dir_check)
+        try:
+            yield from crawler.walk(ftp_dir, local_dir)
+        finally:
+            if self.listing_cache is not None:
+                self.listing_cache.save()
+
+    def append_ftp_file(self, ftp_file: FTPFile) -> bool:
+        return self._file_to_download.push(ftp_file)
 
     def _connect(self):
         if self._ftp_handler is not None:
             return
 
-        logging.info(f'connecting {self.url}')
-        self._ftp_handler = ftplib.FTP(self.url, self.username, self.password)
-        self._ftp_handler.set_pasv(self._passive_mode)
-        logging.info(f'connected {self.url}')
+        self._ftp_handler = self._new_handler()
 
     def _disconnect(self):
         try:
-            self._ftp_handler.close()
-        except:
-            pass
+            self._close_handler(self._ftp_handler)
         finally:
             self._ftp_handler = None
 
-    def _mirror_ftp_dir(self, ftp_path, local_path):
-        """ replicates a directory on an ftp server recursively """
-        for item in self._ftp_handler.nlst(ftp_path):
-            ftp_path_item = posixpath.join(ftp_path, item)
+    def _new_handler(self, budgeted: bool=True) -> ftplib.FTP:
+        """ :param bool budgeted: wait for a free slot while `mirror` limits the sessions """
+        slots = self._session_slots if budgeted else None
+        if slots is not None:
+            slots.acquire()
+        try:
+            with self.metrics.phase('connect'):
+                ftp_handler = self.pool.acquire(
+                    self.url, self.username, self.password, self._passive_mode, self.port)
+        except BaseException:
+            if slots is not None:
+                slots.release()
+            raise
 
-            local_item = item.lstrip("/")
-            local_path_item = os.path.join(local_path, local_item)
+        if slots is not None:
+            self._slot_holders[ftp_handler] = slots
+        return ftp_handler
 
-            if self._is_ftp_dir(ftp_path_item):
-                self._mirror_ftp_dir(ftp_path_item, local_path_item)
-            elif self._pattern_check(item):
-                ftp_file = FTPFile(ftp_path_item, local_path_item)
-                # TODO: 추가할 때 중복 제거할 수 있는 방안 고민
-                logging.debug(f'Adding ftp_file: {ftp_file}')
-                self._file_to_download.append(ftp_file)
+    def _close_handler(self, ftp_handler: ftplib.FTP, reusable: bool=True) -> None:
+        slots = self._slot_holders.pop(ftp_handler, None)
+        try:
+            self.pool.release(ftp_handler, reusable)
+        except:
+            pass
+        finally:
+            if slots is not None:
+                slots.release()
 
-    def _is_ftp_dir(self, ftp_path: str):
+    def _scan_ftp_dir(self, ftp_path: str, local_path: str, get_handler, dir_mtime: float=None):
         """
-        simply determines if an item listed on the ftp server is a
-        valid directory or not
+        list one directory on an ftp server
+
+        :param get_handler: callable returning the session to use, only
+            called when the server has to be asked (not on cache hits)
+        :param float dir_mtime: directory mtime from the parent listing
+        :return: (list of (ftp_dir, local_dir, dir_mtime), list of FTPFile to download)
         """
-        ext_size = 4
-        name = os.path.basename(ftp_path)
-        if len(name) >= ext_size and name[-1 * ext_size] == '.':
+        entries = self._list_dir(ftp_path, get_handler, dir_mtime)
+        link_dirs = {
+            ftp_dir for ftp_dir in self._link_paths(ftp_path, entries)
+            if self._is_ftp_dir(ftp_dir, get_handler())}
+        dirs, candidates = self._split_listing(ftp_path, local_path, entries, link_dirs)
+
+        files = list()
+        for ftp_file in candidates:
+            if self.sync and self._is_synced(ftp_file, get_handler):
+                logging.debug(f'Skipping unchanged ftp_file: {ftp_file}')
+                continue
+            logging.debug(f'Adding ftp_file: {ftp_file}')
+            files.append(ftp_file)
+
+        return dirs, files
+
+    def _list_dir(self, ftp_path: str, get_handler, dir_mtime: float=None) -> list:
+        cache_key = None
+        if self.listing_cache is not None:
+            cache_key = ListingCache.make_key(self.url, self.port, ftp_path)
+            entries = self.listing_cache.get(cache_key, dir_mtime)
+            if entries is not None:
+                return entries
+
+        with self.metrics.phase('list'):
+            ftp_handler = get_handler()
+            entries = None
+            if self._use_mlsd:
+                try:
+                    entries = list_dir(ftp_handler, ftp_path, use_mlsd=True)
+                except MlsdUnsupported:
+                    logging.info(f'MLSD is not supported by {self.url}, using LIST')
+                    self._use_mlsd = False
+
+            if entries is None:
+                entries = list_dir(ftp_handler, ftp_path, use_mlsd=False)
+
+        if cache_key is not None:
+            self.listing_cache.put(cache_key, entries, dir_mtime)
+        return entries
+
+    def _is_synced(self, ftp_file: FTPFile, get_handler) -> bool:
+        if not os.path.exists(ftp_file.local_path):
             return False
 
-        original_cwd = self._ftp_handler.pwd()
+        if ftp_file.size is None:
+            ftp_file.size = self._remote_size(ftp_file.ftp_path, get_handler())
+        if ftp_file.mtime is None:
+            ftp_file.mtime = self._remote_mtime(ftp_file.ftp_path, get_handler())
+        return ftp_file.is_up_to_date()
+
+    def _is_ftp_dir(self, ftp_path: str, ftp_handler: ftplib.FTP):
+        """
+        determines if a symbolic link listed on the ftp server points to
+        a valid directory or not
+        """
+        original_cwd = ftp_handler.pwd()
         try:
-            self._ftp_handler.cwd(ftp_path)
-            self._ftp_handler.cwd(original_cwd)
+            ftp_handler.cwd(ftp_path)
+            ftp_handler.cwd(original_cwd)
             return True
         except ftplib.error_perm:
             return False
-
-    def _pattern_check(self, item):
-        if self.pattern is None or re.search(self.pattern, item):
-            return True
-
-        return False
@@ -1,13 +1,15 @@
-import uuid
-from pathlib import Path
+import os
 
 class FTPFile:
+    # 파일이 수백만 개일 때를 대비해 경로는 문자열 하나로만 보관하고 필요할 때 만듦
+    __slots__ = ('_ftp_path', '_local_path', 'size', 'mtime', 'error')
 
-    def __init__(self, ftp_path: str, local_path: str):
+    def __init__(self, ftp_path: str, local_path: str, size: int=None, mtime: float=None):
         self._ftp_path = ftp_path
-        self._local_path = Path(local_path).absolute()
-        self._local_dir = self._local_path.parent
-        self._temp_path = self._local_dir / str(uuid.uuid4())
+        self._local_path = os.path.abspath(local_path)
+        self.size = size
+        self.mtime = mtime
+        self.error = None
 
     @property
     def ftp_path(self) -> str:
@@ -15,19 +17,43 @@ class FTPFile:
 
     @property
     def local_dir(self) -> str:
-        return str(self._local_dir)
+        return os.path.dirname(self._local_path)
 
     @property
     def local_path(self) -> str:
-        return str(self._local_path)
+        return self._local_path
 
     @property
     def temp_path(self) -> str:
-        return str(self._temp_path)
+        # 이어받기를 위해 임시 파일 이름은 항상 같게 유지
+        return f'{self._local_path}.part'
+
+    @property
+    def segment_path(self) -> str:
+        # 분할 다운로드는 앞부분부터 채워지지 않으므로 이어받기용 .part 와 구분
+        return f'{self._local_path}.seg'
+
+    def is_up_to_date(self) -> bool:
+        """ local file has the same size and is not older than the remote one """
+        if self.size is None or self.mtime is None:
+            return False
+
+        try:
+            stat = os.stat(self._local_path)
+        except OSError:
+            return False
+
+        return stat.st_size == self.size and int(stat.st_mtime) >= int(self.mtime)
 
     def mkdir(self, parents=True, exist_ok=True):
-        self._local_dir.mkdir(
-            parents=parents, exist_ok=exist_ok)
+        if parents:
+            os.makedirs(self.local_dir, exist_ok=exist_ok)
+        else:
+            try:
+                os.mkdir(self.local_dir)
+            except FileExistsError:
+                if not exist_ok:
+                    raise
 
     def __repr__(self):
         return f'<FTP Path: {self.ftp_path}>'
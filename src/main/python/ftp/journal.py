@@ -0,0 +1,182 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+from ftp.ftp_file import FTPFile
+
+QUEUED = 'queued'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    ftp_path TEXT PRIMARY KEY,
+    root TEXT,
+    local_path TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    state TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_root_state ON files (root, state);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    listed INTEGER NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO files (ftp_path, root, local_path, size, mtime, state, byte_offset, error)
+VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, 0), ?)
+ON CONFLICT (ftp_path) DO UPDATE SET
+    root = COALESCE(excluded.root, files.root),
+    local_path = excluded.local_path,
+    size = excluded.size,
+    mtime = excluded.mtime,
+    state = excluded.state,
+    byte_offset = COALESCE(?7, files.byte_offset),
+    error = excluded.error
+"""
+
+
+class JobJournal:
+    """
+    sqlite journal of discovered files, their state and received bytes
+
+    a remote directory whose listing finished is resumed from the journal
+    (queued and in-progress files) instead of being listed again. Once
+    nothing is left unfinished the next run lists it from scratch.
+
+    updates are kept in memory and written in one transaction every
+    `batch_size` changes or `flush_interval` seconds, so the transfer
+    loop only touches a dict.
+    """
+
+    def __init__(self, path: str, batch_size: int=1000, flush_interval: float=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending = dict()  # ftp_path -> row for _UPSERT
+        self._offsets = dict()  # ftp_path -> bytes received (in-progress files)
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+
+    def record(self, ftp_file: FTPFile, state: str, root: str=None, offset: int=None) -> None:
+        """
+        :param str root: remote directory the file was found under (when queued)
+        :param int offset: bytes already in the local temp file, None keeps the last value
+        """
+        with self._lock:
+            if root is None and ftp_file.ftp_path in self._pending:
+                # 아직 기록하지 않은 이전 상태의 root 유지
+                root = self._pending[ftp_file.ftp_path][1]
+            self._pending[ftp_file.ftp_path] = (
+                ftp_file.ftp_path, root, ftp_file.local_path, ftp_file.size, ftp_file.mtime,
+                state, offset, ftp_file.error)
+            if state == IN_PROGRESS:
+                self._offsets[ftp_file.ftp_path] = offset or 0
+            else:
+                self._offsets.pop(ftp_file.ftp_path, None)
+            self._flush_if_due()
+
+    def add_bytes(self, ftp_path: str, size: int) -> None:
+        with self._lock:
+            if ftp_path in self._offsets:
+                self._offsets[ftp_path] += size
+            self._flush_if_due()
+
+    def start_listing(self, root: str) -> dict:
+        """
+        mark `root` as being listed
+
+        :return: {ftp_path: (size, mtime)} of files already done under `root`,
+                 left over from a run interrupted while listing
+        """
+        self.flush()
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO roots (root, listed) VALUES (?, 0)', (root,))
+            rows = self._db.execute(
+                'SELECT ftp_path, size, mtime FROM files WHERE root = ? AND state = ?',
+                (root, DONE)).fetchall()
+        return {ftp_path: (size, mtime) for ftp_path, size, mtime in rows}
+
+    def finish_listing(self, root: str) -> None:
+        self.flush()
+        with self._lock, self._db:
+            self._db.execute('UPDATE roots SET listed = 1 WHERE root = ?', (root,))
+
+    def unfinished(self, root: str):
+        """
+        :return: FTPFile list to resume for a fully listed `root`,
+                 None when `root` has to be listed (again)
+        """
+        self.flush()
+        with self._lock:
+            listed = self._db.execute(
+                'SELECT listed FROM roots WHERE root = ?', (root,)).fetchone()
+            if not listed or not listed[0]:
+                return None
+
+            rows = self._db.execute(
+                'SELECT ftp_path, local_path, size, mtime FROM files '
+                'WHERE root = ? AND state IN (?, ?) ORDER BY rowid',
+                (root, QUEUED, IN_PROGRESS)).fetchall()
+            if not rows:
+                # 지난 실행이 끝까지 완료됨, 새로 조회하도록 기록 삭제
+                with self._db:
+                    self._db.execute('DELETE FROM files WHERE root = ?', (root,))
+                    self._db.execute('DELETE FROM roots WHERE root = ?', (root,))
+                return None
+
+        return [FTPFile(*row) for row in rows]
+
+    def counts(self) -> dict:
+        """ number of files per state """
+        self.flush()
+        with self._lock:
+            return dict(self._db.execute(
+                'SELECT state, COUNT(*) FROM files GROUP BY state').fetchall())
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def _flush_if_due(self) -> None:
+        if len(self._pending) >= self.batch_size \
+                or time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending and not self._offsets:
+            return
+
+        try:
+            with self._db:
+                self._db.executemany(_UPSERT, list(self._pending.values()))
+                self._db.executemany(
+                    'UPDATE files SET byte_offset = ? WHERE ftp_path = ?',
+                    [(offset, ftp_path) for ftp_path, offset in self._offsets.items()])
+        except sqlite3.Error as e:
+            # 기록 실패로 다운로드를 멈추지 않음, 다음 기록 때 다시 시도
+            logging.warning(f'journal {self.path} write failed: {e}')
+            return
+        self._pending.clear()
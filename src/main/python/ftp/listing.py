@@ -0,0 +1,154 @@
+import ftplib
+import logging
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from ftp.util import parse_ftp_time
+
+
+class MlsdUnsupported(ftplib.error_perm):
+    """ server does not know the MLSD command (500/502/504) """
+
+
+# type: 'dir', 'file' 또는 'link' (링크는 대상이 디렉터리인지 알 수 없음)
+FTPEntry = namedtuple('FTPEntry', ['name', 'type', 'size', 'mtime'])
+
+_MONTHS = {
+    name: i for i, name in enumerate(
+        ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
+         'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+
+
+def list_dir(ftp_handler: ftplib.FTP, ftp_path: str, use_mlsd: bool=True) -> list:
+    """
+    list a remote directory with one command
+
+    :param ftplib.FTP ftp_handler: connected ftp session
+    :param str ftp_path: remote directory
+    :param bool use_mlsd: try MLSD before falling back to LIST
+    :return: list of FTPEntry
+    :raise MlsdUnsupported: MLSD is not supported by the server
+    """
+    if use_mlsd:
+        return _list_mlsd(ftp_handler, ftp_path)
+
+    lines = list()
+    ftp_handler.retrlines(f'LIST {ftp_path}', lines.append)
+    entries = list()
+    for line in lines:
+        entry = parse_list_line(line)
+        if entry is None:
+            logging.debug(f'unparsed LIST line: {line}')
+        elif entry.name not in ('.', '..'):
+            entries.append(entry)
+
+    return entries
+
+
+def _list_mlsd(ftp_handler: ftplib.FTP, ftp_path: str) -> list:
+    try:
+        # facts 를 지정하면 OPTS MLST 를 먼저 보내는데, MLSD 가 없는 서버(vsftpd)는
+        # 501 로 답하므로 지원 여부를 알 수 있는 MLSD 만 보냄 (기본 facts 에 size, modify 포함)
+        items = list(ftp_handler.mlsd(ftp_path))
+    except ftplib.error_perm as e:
+        # 500/502/504: 명령어 자체를 지원하지 않는 서버
+        if str(e)[:3] in ('500', '502', '504'):
+            raise MlsdUnsupported(*e.args) from e
+        raise
+
+    entries = list()
+    for name, facts in items:
+        entry = _mlsd_entry(name, facts)
+        if entry is not None:
+            entries.append(entry)
+
+    return entries
+
+
+def parse_mlsd_line(line: str):
+    """
+    parse one line of MLSD output (`type=file;size=1;modify=...; name`)
+
+    :param str line: MLSD output line
+    :return: FTPEntry or None for the current/parent directory entries
+    """
+    facts_found, _, name = line.rstrip('\r\n').partition(' ')
+    facts = dict()
+    for fact in facts_found[:-1].split(';'):
+        key, _, value = fact.partition('=')
+        facts[key.lower()] = value
+
+    return _mlsd_entry(name, facts)
+
+
+def _mlsd_entry(name: str, facts: dict):
+    entry_type = facts.get('type', '').lower()
+    if entry_type in ('cdir', 'pdir'):
+        return None
+
+    if entry_type not in ('dir', 'file'):
+        entry_type = 'link'
+
+    size = int(facts['size']) if 'size' in facts else None
+    mtime = parse_ftp_time(facts['modify']) if 'modify' in facts else None
+    return FTPEntry(name, entry_type, size, mtime)
+
+
+def parse_list_line(line: str):
+    """
+    parse one line of LIST output (unix `ls -l` or DOS style)
+
+    :param str line: LIST output line
+    :return: FTPEntry or None when the line is not understood
+    """
+    parts = line.split(None, 8)
+    if len(parts) == 9 and parts[0][:1] in ('d', '-', 'l'):
+        return _parse_unix_line(parts)
+
+    parts = line.split(None, 3)
+    if len(parts) == 4 and parts[0][:1].isdigit():
+        return _parse_dos_line(parts)
+
+    return None
+
+
+def _parse_unix_line(parts: list):
+    mode, _, _, _, size, month, day, year_or_time, name = parts
+    entry_type = {'d': 'dir', '-': 'file', 'l': 'link'}[mode[0]]
+    if entry_type == 'link':
+        name = name.split(' -> ')[0]
+
+    try:
+        size = int(size)
+        month = _MONTHS[month[:3].lower()]
+        day = int(day)
+        if ':' in year_or_time:
+            # 올해 파일은 연도 대신 시각이 표시됨
+            hour, minute = (int(v) for v in year_or_time.split(':'))
+            now = datetime.now(timezone.utc)
+            dt = datetime(now.year, month, day, hour, minute, tzinfo=timezone.utc)
+            if dt > now:
+                dt = dt.replace(year=now.year - 1)
+        else:
+            dt = datetime(int(year_or_time), month, day, tzinfo=timezone.utc)
+    except (KeyError, ValueError):
+        return None
+
+    return FTPEntry(name, entry_type, size if entry_type == 'file' else None, dt.timestamp())
+
+
+def _parse_dos_line(parts: list):
+    date, time, size, name = parts
+    try:
+        dt = datetime.strptime(f'{date} {time}', '%m-%d-%y %I:%M%p')
+    except ValueError:
+        return None
+
+    mtime = dt.replace(tzinfo=timezone.utc).timestamp()
+    if size.upper() == '<DIR>':
+        return FTPEntry(name, 'dir', None, mtime)
+
+    try:
+        return FTPEntry(name, 'file', int(size), mtime)
+    except ValueError:
+        return None
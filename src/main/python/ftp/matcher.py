@@ -0,0 +1,70 @@
+import re
+import fnmatch
+
+
+class PathMatcher:
+    """
+    include/exclude rules matched against full remote paths
+
+    a rule is a regular expression (searched anywhere in the path, like
+    `pattern`) or, with a `glob:` prefix, a shell pattern matched against
+    the whole path (`*` also matches `/`). All rules of a kind are
+    compiled once into a single alternation, except rules with inline
+    global flags or groups, which are matched on their own since an
+    alternation would move the flags or renumber backreferences.
+
+    a directory is pruned when its path with a trailing `/` matches an
+    exclude rule, so `glob:*/tmp/*` or `/tmp/` skip whole subtrees
+    without listing them.
+    """
+
+    def __init__(self, include: list=None, exclude: list=None):
+        self.include = self._compile(include or [])
+        self.exclude = self._compile(exclude or [])
+
+    def match_file(self, ftp_path: str) -> bool:
+        if self.exclude is not None and self.exclude.search(ftp_path):
+            return False
+        return self.include is None or self.include.search(ftp_path)
+
+    def match_dir(self, ftp_path: str) -> bool:
+        """ False when the directory and everything below it is excluded """
+        if self.exclude is None:
+            return True
+        return not self.exclude.search(ftp_path.rstrip('/') + '/')
+
+    @staticmethod
+    def _compile(rules: list):
+        if not rules:
+            return None
+
+        patterns = list()
+        separate = list()
+        for rule in rules:
+            if rule.startswith('glob:'):
+                patterns.append(f'^{fnmatch.translate(rule[len("glob:"):])}')
+                continue
+
+            if rule.startswith('re:'):
+                rule = rule[len('re:'):]
+            # 잘못된 규칙은 여기서 어떤 규칙인지 알 수 있게 오류 발생
+            compiled = re.compile(rule)
+            if compiled.groups or compiled.flags & ~re.UNICODE:
+                # (?i) 같은 전역 플래그나 역참조 번호는 하나로 합치면 의미가 바뀜
+                separate.append(compiled)
+            else:
+                patterns.append(rule)
+
+        if patterns:
+            separate.insert(0, re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)))
+        return _RuleSet(separate)
+
+
+class _RuleSet:
+    """ compiled rules of one kind, true when any of them is found in the path """
+
+    def __init__(self, patterns: list):
+        self.patterns = patterns
+
+    def search(self, ftp_path: str) -> bool:
+        return any(pattern.search(ftp_path) for pattern in self.patterns)
@@ -0,0 +1,123 @@
+import json
+import time
+import threading
+import contextlib
+from collections import deque
+
+
+class TransferMetrics:
+    """ thread-safe byte counters, throughput and phase timings of a client """
+
+    def __init__(self, window: float=5.0, clock=time.monotonic):
+        """
+        :param float window: seconds used for the instantaneous throughput
+        :param clock: function returning the current time in seconds
+        """
+        self.window = window
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._started = None
+        self._total_bytes = 0       # 크기를 아는 전체 파일 용량
+        self._done_bytes = 0        # 이번 실행에서 받은 용량
+        self._skipped_bytes = 0     # 이어받기로 건너뛴 용량
+        self._files_done = 0
+        self._file_bytes = dict()   # ftp_path -> 받은 용량 (진행 중인 파일)
+        self._samples = deque()     # (time, bytes) 최근 수신 기록
+        self._phases = dict()       # phase -> [count, seconds]
+
+    def add_expected(self, size: int) -> None:
+        if size:
+            with self._lock:
+                self._total_bytes += size
+
+    def add_skipped(self, size: int) -> None:
+        with self._lock:
+            self._skipped_bytes += size
+
+    def add_bytes(self, ftp_path: str, size: int) -> int:
+        """ record received bytes, return bytes received so far for the file """
+        now = self.clock()
+        with self._lock:
+            if self._started is None:
+                self._started = now
+            self._done_bytes += size
+            file_bytes = self._file_bytes.get(ftp_path, 0) + size
+            self._file_bytes[ftp_path] = file_bytes
+
+            self._samples.append((now, size))
+            while self._samples and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+        return file_bytes
+
+    def file_done(self, ftp_path: str) -> None:
+        with self._lock:
+            self._file_bytes.pop(ftp_path, None)
+            self._files_done += 1
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """ accumulate the time spent in a phase (connect, list, transfer, move) """
+        started = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - started
+            with self._lock:
+                count_seconds = self._phases.setdefault(name, [0, 0.0])
+                count_seconds[0] += 1
+                count_seconds[1] += elapsed
+
+    def average_throughput(self) -> float:
+        """ bytes per second since the first received byte """
+        with self._lock:
+            if self._started is None:
+                return 0.0
+            elapsed = self.clock() - self._started
+            return self._done_bytes / elapsed if elapsed > 0 else 0.0
+
+    def current_throughput(self) -> float:
+        """ bytes per second over the last `window` seconds """
+        now = self.clock()
+        with self._lock:
+            samples = [(t, size) for t, size in self._samples if now - t <= self.window]
+            if not samples:
+                return 0.0
+            elapsed = max(now - samples[0][0], min(self.window, now - self._started))
+            return sum(size for _, size in samples) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """ seconds left for the files with a known size, None if unknown """
+        throughput = self.current_throughput() or self.average_throughput()
+        with self._lock:
+            remaining = self._total_bytes - self._done_bytes - self._skipped_bytes
+        if throughput <= 0:
+            return None
+        return max(0.0, remaining) / throughput
+
+    def snapshot(self) -> dict:
+        """ structured view of the counters, safe to serialize """
+        current = self.current_throughput()
+        average = self.average_throughput()
+        eta = self.eta()
+        with self._lock:
+            return dict(
+                files_done=self._files_done,
+                bytes_done=self._done_bytes,
+                bytes_skipped=self._skipped_bytes,
+                bytes_total=self._total_bytes,
+                files_in_progress=dict(self._file_bytes),
+                throughput=current,
+                average_throughput=average,
+                eta=eta,
+                phases={
+                    name: dict(count=count, seconds=round(seconds, 6))
+                    for name, (count, seconds) in self._phases.items()})
+
+    def dump(self, path: str=None) -> dict:
+        """ snapshot, also written as json when `path` is given """
+        snapshot = self.snapshot()
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(snapshot, f, indent=2)
+        return snapshot
@@ -0,0 +1,125 @@
+import time
+import atexit
+import hashlib
+import ftplib
+import logging
+import threading
+
+
+class FTPConnectionPool:
+    """
+    keeps logged-in ftp sessions alive for reuse, keyed by
+    (host, port, user, password hash, passive)
+    """
+
+    def __init__(self, keepalive: float=30, max_idle_time: float=300, timeout: float=60):
+        """
+        :param float keepalive: seconds between NOOPs sent to idle sessions
+        :param float max_idle_time: idle sessions older than this are closed
+        :param float timeout: socket timeout for new sessions
+        """
+        self.keepalive = keepalive
+        self.max_idle_time = max_idle_time
+        self.timeout = timeout
+
+        self._idle = dict()     # key -> list of (ftp_handler, idle_since)
+        self._in_use = dict()   # ftp_handler -> key
+        self._lock = threading.Lock()
+        self._keepalive_thread = None
+        self._closed = threading.Event()
+
+    def acquire(self, host: str, username: str, password: str, passive: bool=True,
+                port: int=21) -> ftplib.FTP:
+        """ return a live session, reusing an idle one when possible """
+        # 다른 비밀번호로 로그인한 세션을 넘겨주지 않도록 비밀번호도 키에 포함 (해시만 보관)
+        key = (host, port, username, hashlib.sha256(password.encode()).hexdigest(), passive)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    break
+                ftp_handler, idle_since = idle.pop()
+
+            if time.monotonic() - idle_since < self.keepalive or self._is_alive(ftp_handler):
+                with self._lock:
+                    self._in_use[ftp_handler] = key
+                return ftp_handler
+
+            # 서버가 끊은 세션은 버리고 다음 세션 확인
+            self._quit(ftp_handler)
+
+        logging.info(f'connecting {host}')
+        ftp_handler = ftplib.FTP(timeout=self.timeout)
+        ftp_handler.connect(host, port)
+        ftp_handler.login(username, password)
+        ftp_handler.set_pasv(passive)
+        logging.info(f'connected {host}')
+
+        with self._lock:
+            self._in_use[ftp_handler] = key
+        return ftp_handler
+
+    def release(self, ftp_handler: ftplib.FTP, reusable: bool=True) -> None:
+        """ give a session back; broken or aborted sessions are closed """
+        with self._lock:
+            key = self._in_use.pop(ftp_handler, None)
+            if reusable and key is not None and not self._closed.is_set():
+                self._idle.setdefault(key, []).append((ftp_handler, time.monotonic()))
+                self._start_keepalive()
+                return
+
+        self._quit(ftp_handler)
+
+    def close(self) -> None:
+        """ close every idle session and stop the keepalive thread """
+        self._closed.set()
+        with self._lock:
+            idle = [h for sessions in self._idle.values() for h, _ in sessions]
+            self._idle.clear()
+
+        for ftp_handler in idle:
+            self._quit(ftp_handler)
+
+    def _start_keepalive(self) -> None:
+        if self._keepalive_thread is not None:
+            return
+
+        self._keepalive_thread = threading.Thread(target=self._keepalive_loop, daemon=True)
+        self._keepalive_thread.start()
+
+    def _keepalive_loop(self) -> None:
+        while not self._closed.wait(self.keepalive):
+            with self._lock:
+                sessions = [
+                    (key, h, idle_since)
+                    for key, idle in self._idle.items() for h, idle_since in idle]
+                self._idle.clear()
+
+            now = time.monotonic()
+            alive = list()
+            for key, ftp_handler, idle_since in sessions:
+                if now - idle_since > self.max_idle_time or not self._is_alive(ftp_handler):
+                    self._quit(ftp_handler)
+                else:
+                    alive.append((key, ftp_handler, idle_since))
+
+            with self._lock:
+                for key, ftp_handler, idle_since in alive:
+                    self._idle.setdefault(key, []).append((ftp_handler, idle_since))
+
+    def _is_alive(self, ftp_handler: ftplib.FTP) -> bool:
+        try:
+            ftp_handler.voidcmd('NOOP')
+            return True
+        except (*ftplib.all_errors, AttributeError):
+            return False
+
+    def _quit(self, ftp_handler: ftplib.FTP) -> None:
+        try:
+            ftp_handler.quit()
+        except (*ftplib.all_errors, AttributeError):
+            ftp_handler.close()
+
+
+default_pool = FTPConnectionPool()
+atexit.register(default_pool.close)
@@ -0,0 +1,244 @@
+"""
+post-processing of downloaded files on a process pool
+
+steps run in order on each downloaded file, each one gets the path
+left by the previous step:
+
+    post_process:
+    - extract                      # .tar/.tar.gz/.tgz/.tar.bz2/.tar.xz/.zip -> <name>/
+    - gunzip                       # a.txt.gz -> a.txt
+    - checksum: sha256             # writes <path>.sha256
+    - move: /data/archive          # relocates the result, fails if it is already there
+    - move: {dest: /data/archive, overwrite: true}
+    - hook: mypackage.module:func  # func(path) -> new path or None
+"""
+import os
+import gzip
+import shutil
+import hashlib
+import logging
+import tarfile
+import zipfile
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+_TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def parse_steps(steps_cfg: list) -> list:
+    """
+    :param list steps_cfg: `post_process` config, names or one-key dicts
+    :return: list of (name, options dict)
+    """
+    steps = list()
+    for step in steps_cfg or []:
+        if isinstance(step, str):
+            name, options = step, dict()
+        elif isinstance(step, dict) and len(step) == 1:
+            name, options = next(iter(step.items()))
+            if not isinstance(options, dict):
+                # `move: /data` 처럼 값 하나만 주면 단계의 기본 인자로 사용
+                options = {_DEFAULT_OPTION.get(name, 'value'): options}
+        else:
+            raise ValueError(f'invalid post_process step: {step!r}')
+
+        if name not in STEPS:
+            raise ValueError(f'unknown post_process step {name!r}, expected one of {", ".join(STEPS)}')
+        steps.append((name, options or dict()))
+
+    return steps
+
+
+def run_steps(path: str, steps: list) -> dict:
+    """
+    apply `steps` to one file, runs in a pool process
+
+    :return: dict with the downloaded `path` and the final `output` path
+    """
+    output = path
+    for name, options in steps:
+        output = STEPS[name](output, **options)
+    return dict(path=path, output=output)
+
+
+def extract(path: str, dest: str=None, remove: bool=False) -> str:
+    """ unpack a tar or zip archive into `dest` (default: archive name without suffix) """
+    lower = path.lower()
+    if lower.endswith('.zip'):
+        suffix = '.zip'
+    else:
+        suffix = next((s for s in _TAR_SUFFIXES if lower.endswith(s)), None)
+        if suffix is None:
+            return path
+
+    dest = dest or path[:-len(suffix)]
+    os.makedirs(dest, exist_ok=True)
+    if suffix == '.zip':
+        with zipfile.ZipFile(path) as archive:
+            archive.extractall(dest)
+    else:
+        with tarfile.open(path) as archive:
+            if hasattr(tarfile, 'data_filter'):
+                archive.extractall(dest, filter='data')
+            else:
+                _check_members(archive, dest)
+                archive.extractall(dest)
+
+    if remove:
+        os.remove(path)
+    return dest
+
+
+def gunzip(path: str, keep: bool=False) -> str:
+    """ decompress `a.gz` to `a`, tar archives are left to `extract` """
+    lower = path.lower()
+    if not lower.endswith('.gz') or lower.endswith('.tar.gz'):
+        return path
+
+    output = path[:-len('.gz')]
+    with gzip.open(path, 'rb') as src, open(output, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    shutil.copystat(path, output)
+    if not keep:
+        os.remove(path)
+    return output
+
+
+def checksum(path: str, algorithm: str='sha256') -> str:
+    """ write `<path>.<algorithm>` in `sha256sum` format, directories are skipped """
+    if os.path.isdir(path):
+        return path
+
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    with open(f'{path}.{algorithm}', 'w') as f:
+        f.write(f'{digest.hexdigest()}  {os.path.basename(path)}\n')
+    return path
+
+
+def move(path: str, dest: str, overwrite: bool=False) -> str:
+    """
+    move the file or directory into the `dest` directory
+
+    :param bool overwrite: replace what is already at the destination
+        instead of failing
+    """
+    os.makedirs(dest, exist_ok=True)
+    target = os.path.join(dest, os.path.basename(path.rstrip(os.sep)))
+    if os.path.lexists(target):
+        if not overwrite:
+            raise FileExistsError(f'{target} already exists, set `overwrite: true` to replace it')
+        logging.warning(f'replacing {target}')
+        if os.path.isdir(target) and not os.path.islink(target):
+            shutil.rmtree(target)
+        else:
+            os.remove(target)
+    return shutil.move(path, target)
+
+
+def hook(path: str, function: str) -> str:
+    """ call `module:function` with the path, a returned path replaces it """
+    module_name, _, function_name = function.partition(':')
+    result = getattr(importlib.import_module(module_name), function_name)(path)
+    return path if result is None else result
+
+
+STEPS = dict(extract=extract, gunzip=gunzip, checksum=checksum, move=move, hook=hook)
+_DEFAULT_OPTION = dict(extract='dest', checksum='algorithm', move='dest', hook='function')
+
+
+def _check_members(archive: tarfile.TarFile, dest: str) -> None:
+    # 압축 파일 안의 경로가 대상 디렉터리 밖을 가리키면 풀지 않음
+    root = os.path.realpath(dest)
+    for member in archive.getmembers():
+        target = os.path.realpath(os.path.join(root, member.name))
+        if os.path.commonpath([root, target]) != root or member.issym() or member.islnk() \
+                or member.isdev():
+            raise ValueError(f'unsafe archive member {member.name!r} in {archive.name}')
+
+
+class PostProcessor:
+    """
+    run post-processing steps for downloaded files on a process pool
+
+    `submit` blocks while `queue_size` files are waiting or running, so a
+    slow disk or CPU bounds the backlog instead of growing it without
+    limit; transfers keep going as long as the pool keeps up.
+    """
+
+    def __init__(self, steps: list, workers: int=2, queue_size: int=None):
+        """
+        :param list steps: list of (name, options), see `parse_steps`
+        :param int workers: pool processes
+        :param int queue_size: files submitted but not finished, default `workers` * 4
+        """
+        self.steps = steps
+        self.workers = workers
+        self.queue_size = queue_size or workers * 4
+
+        self.results = list()   # run_steps 결과
+        self.errors = list()    # (local_path, error)
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_cfg(cls, ftp_cfg: dict) -> 'PostProcessor':
+        return cls(
+            parse_steps(ftp_cfg['post_process']),
+            ftp_cfg.get('post_process_workers', 2),
+            ftp_cfg.get('post_process_queue'))
+
+    def submit(self, path: str) -> None:
+        self._slots.acquire()
+        try:
+            with self._cond:
+                if self._executor is None:
+                    # 전송 스레드가 도는 중에 fork 하면 잠긴 lock 을 물려받을 수 있어 forkserver 사용
+                    context = multiprocessing.get_context(
+                        'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None)
+                    self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+                future = self._executor.submit(run_steps, path, self.steps)
+                self._pending += 1
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda f: self._done(path, f))
+
+    def wait(self) -> None:
+        """ block until every submitted file is processed """
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending == 0)
+
+    def close(self) -> None:
+        self.wait()
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def add_error(self, path: str, error: Exception) -> None:
+        """ record a file that could not be processed, e.g. because `submit` raised """
+        with self._cond:
+            self.errors.append((path, f'{type(error).__name__}: {error}'))
+        logging.error(f'post processing failed for {path}: {error}')
+
+    def _done(self, path: str, future) -> None:
+        error = future.exception()
+        with self._cond:
+            if error is None:
+                self.results.append(future.result())
+            self._pending -= 1
+            self._cond.notify_all()
+        self._slots.release()
+
+        if error is None:
+            logging.info(f'post processed: {path}')
+        else:
+            self.add_error(path, error)
@@ -0,0 +1,59 @@
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    thread-safe token bucket limiting bytes per second
+
+    tokens may go negative: a consumer takes its chunk immediately and
+    sleeps off the debt, so later consumers queue behind it. Since every
+    transfer consumes in small chunks, concurrent transfers end up with
+    an even share of the bandwidth.
+    """
+
+    def __init__(self, rate: float, burst: float=None):
+        """
+        :param float rate: bytes per second
+        :param float burst: bucket size in bytes (default: one second of `rate`)
+        """
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        """ take `size` tokens, sleeping when the bucket is in debt """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= size
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+_buckets = dict()
+_buckets_lock = threading.Lock()
+
+
+def shared_bucket(key: str, rate: float) -> TokenBucket:
+    """
+    bucket shared by every client of the process for `key`
+    (e.g. '*' for the global cap, host name for per-host caps)
+
+    the buckets are process-global state: they live in a module-level
+    dict until the process exits, so parallel jobs and later runs in the
+    same process (`--watch`, the GUI) share them, and the `rate` of the
+    latest call replaces the previous one for every holder
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(rate)
+        elif bucket.rate != rate:
+            bucket.rate = bucket.burst = rate
+        return bucket
@@ -0,0 +1,79 @@
+import os
+import json
+import socket
+import ftplib
+import random
+
+from ftp.ftp_file import FTPFile
+from ftp.verify import ChecksumError
+
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+
+def classify_error(error: Exception) -> str:
+    """
+    decide whether a failed transfer is worth retrying
+
+    4xx replies, broken or timed out connections and corrupted
+    transfers are transient, 5xx replies (no such file, permission
+    denied) are permanent
+    """
+    if isinstance(error, (ftplib.error_temp, ChecksumError)):
+        return TRANSIENT
+    if isinstance(error, ftplib.error_perm):
+        return PERMANENT
+    if isinstance(error, (ftplib.error_reply, ftplib.error_proto, EOFError,
+                          socket.timeout, ConnectionError)):
+        return TRANSIENT
+    if isinstance(error, OSError) and not isinstance(error, (FileNotFoundError, PermissionError)):
+        # 네트워크 관련 OSError (ENETUNREACH 등) 포함
+        return TRANSIENT
+
+    return PERMANENT
+
+
+class RetryPolicy:
+    """ exponential backoff with full jitter """
+
+    def __init__(self, max_retries: int=3, base_delay: float=1.0, max_delay: float=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """ :param int attempt: number of retries already made """
+        return attempt < self.max_retries and classify_error(error) == TRANSIENT
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def save_failed_files(path: str, ftp_files: list) -> None:
+    """ write the dead-letter list, removing it when nothing failed """
+    if not ftp_files:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    data = [
+        dict(ftp_path=f.ftp_path, local_path=f.local_path,
+             size=f.size, mtime=f.mtime, error=f.error)
+        for f in ftp_files]
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def load_failed_files(path: str) -> list:
+    """ read FTPFile list saved by `save_failed_files` """
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as f:
+        data = json.load(f)
+
+    return [
+        FTPFile(item['ftp_path'], item['local_path'], item.get('size'), item.get('mtime'))
+        for item in data]
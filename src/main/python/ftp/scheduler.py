@@ -0,0 +1,110 @@
+import logging
+import threading
+
+
+class JobScheduler:
+    """
+    run download jobs in parallel within a total worker budget and
+    per-host connection caps
+
+    every job starts in its own thread and waits until both the budget
+    and its host have a free slot. It then gets its `workers`, clipped
+    to a fair share of the free budget and to what its host has left,
+    and gives them back when it finishes, so one slow server only holds
+    its own share. Listing and downloading share the granted sessions,
+    also in pipeline mode. Segmented downloads open up to
+    `segment_count` extra sessions per worker on top of the grant, so a
+    host may see up to `workers * (segment_count + 1)` sessions.
+    """
+
+    def __init__(self, max_workers: int=8, max_host_connections: int=None,
+                 host_connections: dict=None):
+        """
+        :param int max_workers: workers shared by all running jobs
+        :param int max_host_connections: default cap of sessions per host, None for no cap
+        :param dict host_connections: host -> cap, overrides `max_host_connections`
+        """
+        self.max_workers = max_workers
+        self.max_host_connections = max_host_connections
+        self.host_connections = host_connections or dict()
+
+        self._free = max_workers
+        self._host_used = dict()    # host -> workers of running jobs
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_cfg(cls, scheduler_cfg: dict) -> 'JobScheduler':
+        """ :param dict scheduler_cfg: `scheduler` block of config.yml (see `get_scheduler_cfg`) """
+        return cls(
+            scheduler_cfg.get('max_workers', 8),
+            scheduler_cfg.get('max_host_connections'),
+            scheduler_cfg.get('host_connections'))
+
+    def host_limit(self, host: str):
+        return self.host_connections.get(host, self.max_host_connections)
+
+    def run(self, jobs: list, run_job) -> list:
+        """
+        :param list jobs: job configs (see `get_jobs`)
+        :param run_job: callable taking a job config whose `workers` is the granted count
+        :return: return values of `run_job` in job order, None for a job
+            whose `run_job` raised
+        """
+        results = [None] * len(jobs)
+        with self._cond:
+            self._waiting += len(jobs)
+
+        threads = [
+            threading.Thread(
+                target=self._run_job, args=(index, job, run_job, results),
+                name=f'job-{job.get("name", index)}', daemon=True)
+            for index, job in enumerate(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def _run_job(self, index: int, job: dict, run_job, results: list) -> None:
+        # 설정이 잘못된 작업도 예산 계산에서 빠지도록 모든 예외를 여기서 처리
+        host = job.get('url')
+        workers = None
+        try:
+            workers = self._reserve(host, job.get('workers', 1))
+            logging.info(f'job {job.get("name", index)} started with {workers} workers')
+            results[index] = run_job(dict(job, workers=workers))
+        except Exception:
+            logging.exception(f'job {job.get("name", index)} failed')
+        finally:
+            if workers is None:
+                with self._cond:
+                    self._waiting -= 1
+                    self._cond.notify_all()
+            else:
+                self._release(host, workers)
+
+    def _reserve(self, host: str, requested: int) -> int:
+        requested = max(1, requested)
+        limit = self.host_limit(host)
+        with self._cond:
+            while True:
+                host_free = requested if limit is None else limit - self._host_used.get(host, 0)
+                if self._free > 0 and host_free > 0:
+                    break
+                self._cond.wait()
+
+            # 아직 시작하지 못한 작업과 남은 예산을 나눠 씀
+            share = max(1, self._free // self._waiting)
+            workers = min(requested, share, host_free)
+            self._waiting -= 1
+            self._free -= workers
+            self._host_used[host] = self._host_used.get(host, 0) + workers
+            return workers
+
+    def _release(self, host: str, workers: int) -> None:
+        with self._cond:
+            self._free += workers
+            self._host_used[host] -= workers
+            self._cond.notify_all()
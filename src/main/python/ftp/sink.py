@@ -0,0 +1,248 @@
+"""
+sinks receive the data stream of a download instead of the `.part` file
+
+    sink: file                           # write in place, unnamed until complete
+    sink:
+      pipe: gzip -dc > "$LOCAL_PATH"     # stdin of a command, one process per file
+
+`MemorySink` and `CallbackSink` are for use from code.
+"""
+import io
+import os
+import uuid
+import shlex
+import shutil
+import logging
+import threading
+import subprocess
+
+
+class SinkError(Exception):
+    """ sink could not take the downloaded data """
+
+
+class Sink:
+    """
+    `open` returns a writer for one file with `write(data) -> int`,
+    `commit()` once every byte is written and `abort()` on failure
+
+    sinks take the stream from the first byte, so downloads through a
+    sink are neither resumed nor split into segments.
+    """
+    # 받은 파일이 local_path 에 남으면 True (후처리 대상)
+    local_files = False
+
+    def open(self, ftp_file):
+        raise NotImplementedError
+
+
+class FileSink(Sink):
+    """
+    write directly into the directory of `local_path`
+
+    on Linux the data goes into an unnamed `O_TMPFILE` that is linked in
+    and renamed over `local_path` only when complete, so a crash leaves
+    nothing behind. Elsewhere a uniquely named temp file next to
+    `local_path` is renamed over it.
+    """
+    local_files = True
+
+    def __init__(self, tmpfile: bool=True):
+        """ :param bool tmpfile: use O_TMPFILE when the platform has it """
+        self.tmpfile = tmpfile and hasattr(os, 'O_TMPFILE') and os.path.isdir('/proc/self/fd')
+
+    def open(self, ftp_file) -> '_FileWriter':
+        ftp_file.mkdir()
+        return _FileWriter(ftp_file, self.tmpfile)
+
+
+class MemorySink(Sink):
+    """ keep downloaded files in memory, `data` maps ftp path -> bytes """
+
+    def __init__(self):
+        self.data = dict()
+        self._lock = threading.Lock()
+
+    def open(self, ftp_file) -> '_MemoryWriter':
+        return _MemoryWriter(self, ftp_file)
+
+
+class CallbackSink(Sink):
+    """
+    call `write(ftp_file, chunk)` for every received block, like a
+    `retrbinary` callback; `chunk` is a view of a reused buffer and is
+    only valid during the call
+    """
+
+    def __init__(self, write, done=None, abort=None):
+        """
+        :param write: callable(ftp_file, chunk)
+        :param done: callable(ftp_file) after the last block
+        :param abort: callable(ftp_file) when the download fails or is cancelled
+        """
+        self.write = write
+        self.done = done
+        self.abort = abort
+
+    def open(self, ftp_file) -> '_CallbackWriter':
+        return _CallbackWriter(self, ftp_file)
+
+
+class PipeSink(Sink):
+    """
+    stream each file into the stdin of `command`, which gets FTP_PATH and
+    LOCAL_PATH in its environment; a non-zero exit fails the download
+    """
+
+    def __init__(self, command):
+        """ :param command: shell command string or argument list """
+        self.command = command
+
+    def open(self, ftp_file) -> '_PipeWriter':
+        ftp_file.mkdir()
+        return _PipeWriter(self.command, ftp_file)
+
+
+def get_sink(sink_cfg) -> Sink:
+    """
+    :param sink_cfg: `sink` config, 'file', 'memory' or {'pipe': command}
+    :return: Sink, None when `sink_cfg` is empty
+    """
+    if not sink_cfg:
+        return None
+    if sink_cfg == 'file':
+        return FileSink()
+    if sink_cfg == 'memory':
+        return MemorySink()
+    if isinstance(sink_cfg, dict) and 'pipe' in sink_cfg:
+        return PipeSink(sink_cfg['pipe'])
+    raise ValueError(f'invalid sink: {sink_cfg!r}, expected file, memory or pipe')
+
+
+class _FileWriter:
+
+    def __init__(self, ftp_file, tmpfile: bool):
+        self.ftp_file = ftp_file
+        self.temp_path = None
+        self.fd = None
+        if tmpfile:
+            try:
+                self.fd = os.open(ftp_file.local_dir, os.O_TMPFILE | os.O_RDWR, 0o666)
+            except OSError as e:
+                # 파일 시스템이 지원하지 않으면 이름 있는 임시 파일 사용
+                logging.debug(f'O_TMPFILE failed in {ftp_file.local_dir}: {e}')
+        if self.fd is None:
+            self.temp_path = _temp_path(ftp_file.local_path)
+            self.fd = os.open(self.temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+
+    def write(self, data) -> int:
+        return os.write(self.fd, data)
+
+    def commit(self) -> None:
+        path = self.ftp_file.local_path
+        try:
+            if self.temp_path is None:
+                # 다 받은 뒤에 이름을 붙이므로 받는 중인 파일은 보이지 않음
+                self.temp_path = _temp_path(path)
+                self._link(self.temp_path)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+        os.replace(self.temp_path, path)
+        self.temp_path = None
+        if self.ftp_file.mtime is not None:
+            os.utime(path, (self.ftp_file.mtime, self.ftp_file.mtime))
+
+    def _link(self, target: str) -> None:
+        proc_fd = os.open('/proc/self/fd', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            # linkat(AT_SYMLINK_FOLLOW) 로 /proc/self/fd/N 이 가리키는 열린 파일에 이름을 붙임
+            os.link(str(self.fd), target, src_dir_fd=proc_fd, follow_symlinks=True)
+            return
+        except OSError as e:
+            logging.debug(f'linkat failed for {target}: {e}')
+        finally:
+            os.close(proc_fd)
+
+        # 링크할 수 없으면 같은 디렉터리의 이름 있는 파일로 복사
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        with open(self.fd, 'rb', closefd=False) as src, open(target, 'xb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+    def abort(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        if self.temp_path is not None and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class _MemoryWriter:
+
+    def __init__(self, sink: MemorySink, ftp_file):
+        self.sink = sink
+        self.ftp_file = ftp_file
+        self.buffer = io.BytesIO()
+
+    def write(self, data) -> int:
+        return self.buffer.write(data)
+
+    def commit(self) -> None:
+        with self.sink._lock:
+            self.sink.data[self.ftp_file.ftp_path] = self.buffer.getvalue()
+        self.buffer.close()
+
+    def abort(self) -> None:
+        self.buffer.close()
+
+
+class _CallbackWriter:
+
+    def __init__(self, sink: CallbackSink, ftp_file):
+        self.sink = sink
+        self.ftp_file = ftp_file
+
+    def write(self, data) -> int:
+        self.sink.write(self.ftp_file, data)
+        return len(data)
+
+    def commit(self) -> None:
+        if self.sink.done is not None:
+            self.sink.done(self.ftp_file)
+
+    def abort(self) -> None:
+        if self.sink.abort is not None:
+            self.sink.abort(self.ftp_file)
+
+
+class _PipeWriter:
+
+    def __init__(self, command, ftp_file):
+        self.command = command
+        env = dict(os.environ, FTP_PATH=ftp_file.ftp_path, LOCAL_PATH=ftp_file.local_path)
+        self.process = subprocess.Popen(
+            command, shell=isinstance(command, str), stdin=subprocess.PIPE, bufsize=0, env=env)
+
+    def write(self, data) -> int:
+        return self.process.stdin.write(data)
+
+    def commit(self) -> None:
+        self.process.stdin.close()
+        returncode = self.process.wait()
+        if returncode:
+            command = self.command if isinstance(self.command, str) else shlex.join(self.command)
+            raise SinkError(f'{command} exited with {returncode}')
+
+    def abort(self) -> None:
+        self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+def _temp_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.{uuid.uuid4().hex[:8]}.tmp')
@@ -1,7 +1,7 @@
 import os
 import yaml
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
 
@@ -53,7 +53,90 @@ def get_cfg(config_file):
     with open(config_file) as f:
         cfg = yaml.safe_load(f)
 
+    if cfg.get('jobs'):
+        # 여러 작업을 설정한 경우 첫 번째 작업
+        return get_jobs(config_file)[0]
+
     # ftp setting
     ftp_cfg = cfg['ftp']
 
-    return ftp_cfg
\ No newline at end of file
+    return ftp_cfg
+
+
+def get_jobs(config_file):
+    """
+    get every download job of a config file
+
+    a config has a single `ftp` block and/or a `jobs` list, each job
+    takes the keys it does not set from the `ftp` block
+
+    :param str config_file: config file path (.yml)
+    :return: list of job config dicts, each with a `name`
+    """
+    with open(config_file) as f:
+        cfg = yaml.safe_load(f)
+
+    defaults = cfg.get('ftp') or dict()
+    jobs = list()
+    for index, job in enumerate(cfg.get('jobs') or [dict()]):
+        job_cfg = dict(defaults)
+        job_cfg.update(job)
+        job_cfg.setdefault('name', job_cfg.get('url', f'job{index + 1}'))
+        jobs.append(job_cfg)
+
+    return jobs
+
+
+def save_cfg(config_file, edited):
+    """
+    write values edited in the GUI back to a config file, keeping every
+    other key, job and block
+
+    with a `jobs` list the first job (the one `get_cfg` returns) is
+    updated, a value equal to the `ftp` block default stays inherited
+
+    :param str config_file: config file path (.yml)
+    :param dict edited: keys and values to change
+    """
+    try:
+        with open(config_file) as f:
+            cfg = yaml.safe_load(f) or dict()
+    except FileNotFoundError:
+        cfg = dict()
+
+    if cfg.get('jobs'):
+        defaults = cfg.get('ftp') or dict()
+        job = cfg['jobs'][0]
+        for key, value in edited.items():
+            if key in job or defaults.get(key) != value:
+                job[key] = value
+    else:
+        cfg.setdefault('ftp', dict()).update(edited)
+
+    with open(config_file, 'w') as f:
+        yaml.dump(cfg, f, sort_keys=False)
+
+
+def get_scheduler_cfg(config_file):
+    """
+    get the `scheduler` block of a config file
+
+    :param str config_file: config file path (.yml)
+    :return: scheduler config data, empty when not set
+    """
+    with open(config_file) as f:
+        cfg = yaml.safe_load(f)
+
+    return cfg.get('scheduler') or dict()
+
+
+def parse_ftp_time(value):
+    """
+    convert ftp time value (MDTM, MLSD modify fact) to timestamp
+
+    :param str value: `YYYYMMDDHHMMSS[.sss]` in UTC
+    :return: posix timestamp
+    """
+    value, _, fraction = value.partition('.')
+    dt = datetime.strptime(value, '%Y%m%d%H%M%S').replace(tzinfo=timezone.utc)
+    return dt.timestamp() + (float(f'0.{fraction}') if fraction else 0)
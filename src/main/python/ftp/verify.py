@@ -0,0 +1,97 @@
+import io
+import re
+import zlib
+import ftplib
+import hashlib
+
+HASH_ALGORITHMS = ('md5', 'sha1', 'sha256', 'crc32')
+
+# HASH 명령어(draft-bryan-ftpext-hash) 알고리즘 이름, 비표준 X 명령어
+_HASH_NAMES = {'md5': 'MD5', 'sha1': 'SHA-1', 'sha256': 'SHA-256', 'crc32': 'CRC32'}
+_X_COMMANDS = {'md5': 'XMD5', 'sha1': 'XSHA1', 'sha256': 'XSHA256', 'crc32': 'XCRC'}
+_HEX_LENGTHS = {'md5': 32, 'sha1': 40, 'sha256': 64, 'crc32': 8}
+
+
+class ChecksumError(Exception):
+    """ downloaded file does not match the remote size or checksum """
+
+
+class StreamHasher:
+    """ computes several checksums incrementally while data is written """
+
+    def __init__(self, algorithms):
+        """
+        :param algorithms: names from HASH_ALGORITHMS
+        """
+        self._crc32 = 0 if 'crc32' in algorithms else None
+        self._hashes = {
+            name: hashlib.new(name) for name in algorithms if name != 'crc32'}
+
+    def update(self, data) -> None:
+        for h in self._hashes.values():
+            h.update(data)
+        if self._crc32 is not None:
+            self._crc32 = zlib.crc32(data, self._crc32)
+
+    def update_from_file(self, path: str, length: int=None, blocksize: int=1024 * 1024) -> None:
+        """ feed the first `length` bytes of a file (e.g. a resumed partial) """
+        remaining = length
+        with open(path, 'rb') as f:
+            while remaining is None or remaining > 0:
+                data = f.read(blocksize if remaining is None else min(blocksize, remaining))
+                if not data:
+                    break
+                self.update(data)
+                if remaining is not None:
+                    remaining -= len(data)
+
+    def hexdigests(self) -> dict:
+        digests = {name: h.hexdigest() for name, h in self._hashes.items()}
+        if self._crc32 is not None:
+            digests['crc32'] = f'{self._crc32:08x}'
+        return digests
+
+
+def remote_checksum(ftp_handler: ftplib.FTP, ftp_path: str, algorithm: str):
+    """
+    ask the server for a file checksum with HASH, then the X commands
+
+    :return: lower case hex digest or None when the server can't tell
+    """
+    commands = [
+        (f'OPTS HASH {_HASH_NAMES[algorithm]}', f'HASH {ftp_path}'),
+        (None, f'{_X_COMMANDS[algorithm]} {ftp_path}')]
+    for opts, command in commands:
+        try:
+            if opts:
+                ftp_handler.sendcmd(opts)
+            digest = _find_hex(ftp_handler.sendcmd(command), algorithm)
+        except (ftplib.error_perm, ftplib.error_temp, ftplib.error_reply):
+            continue
+        if digest:
+            return digest
+
+    return None
+
+
+def sidecar_checksum(ftp_handler: ftplib.FTP, ftp_path: str, algorithm: str):
+    """
+    read `<file>.<algorithm>` (md5sum / sha256sum format) next to the file
+
+    :return: lower case hex digest or None when there is no sidecar file
+    """
+    buffer = io.BytesIO()
+    try:
+        ftp_handler.retrbinary(f'RETR {ftp_path}.{algorithm}', buffer.write)
+    except ftplib.error_perm:
+        return None
+
+    return _find_hex(buffer.getvalue().decode('ascii', 'replace'), algorithm)
+
+
+def _find_hex(text: str, algorithm: str):
+    length = _HEX_LENGTHS[algorithm]
+    for token in re.split(r'\s+', text.strip()):
+        if len(token) == length and re.fullmatch(r'[0-9a-fA-F]+', token):
+            return token.lower()
+    return None
@@ -1,35 +1,136 @@
 import os
 import sys
+import time
 import logging
+import threading
+import multiprocessing
 import traceback
-import yaml
 
 from fbs_runtime.application_context.PyQt5 import ApplicationContext
-from PyQt5 import QtGui, QtCore, QtWidgets
+from PyQt5 import QtCore, QtWidgets
 
 # Custom
 from ui import mainwindow, config
-from ftp.ftp_client import FTPClient, FTPFile
-from ftp.util import get_cfg
+from ui.file_list_model import FileListModel
+from ftp.ftp_client import FTPClient, FTPFile, DownloadCancelled
+from ftp.util import get_cfg, save_cfg
 
 logging.basicConfig(level=logging.DEBUG)
 
+# 진행률 표시줄은 받은 용량 / 전체 용량을 천분율로 표시 (QProgressBar 는 int 범위)
+PROGRESS_SCALE = 1000
+
+
+class BatchEmitter:
+    """
+    collect FTPFile emitted by worker threads and pass them on to a
+    `pyqtSignal(list)` in chunks, so the GUI handles one event per batch
+    """
+
+    def __init__(self, signal, size: int = 500, interval: float = 0.2):
+        self.signal = signal
+        self.size = size
+        self.interval = interval
+        self._batch = list()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+
+    def emit(self, ftp_file: FTPFile):
+        with self._lock:
+            self._batch.append(ftp_file)
+            if self._timer is None:
+                # 더 들어오는 파일이 없어도 남은 묶음을 interval 마다 전달
+                self._timer = threading.Thread(target=self._flush_loop, daemon=True)
+                self._timer.start()
+            if (
+                len(self._batch) < self.size
+                and time.monotonic() - self._last_flush < self.interval
+            ):
+                return
+            batch = self._take()
+        self.signal.emit(batch)
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self.signal.emit(batch)
+
+    def close(self):
+        """stop the timed flush and pass on what is left"""
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.interval):
+            if time.monotonic() - self._last_flush >= self.interval:
+                self.flush()
+
+    def _take(self) -> list:
+        batch, self._batch = self._batch, list()
+        self._last_flush = time.monotonic()
+        return batch
+
+
+class scanThread(QtCore.QThread):
+    """원격 목록 조회를 GUI 스레드 밖에서 진행"""
+
+    files_found_signal = QtCore.pyqtSignal(list)
+    error_signal = QtCore.pyqtSignal(str)
+
+    def __init__(self, ftp_client: FTPClient, ftp_dirs: list):
+        super().__init__()
+        self.ftp_client = ftp_client
+        self.ftp_dirs = ftp_dirs
+
+    def run(self):
+        found = BatchEmitter(self.files_found_signal)
+        try:
+            for remote_dir, local_dir in self.ftp_dirs:
+                for ftp_file in self.ftp_client.iter_file_to_download(
+                    remote_dir, local_dir
+                ):
+                    # 이미 목록에 있는 파일은 제외
+                    if self.ftp_client.append_ftp_file(ftp_file):
+                        found.emit(ftp_file)
+        except DownloadCancelled:
+            pass
+        except Exception as e:
+            print(traceback.format_exc())
+            self.error_signal.emit(str(e))
+        finally:
+            found.close()
+
 
 class ftpThread(QtCore.QThread):
-    download_complete_signal = QtCore.pyqtSignal(FTPFile)
+    download_complete_signal = QtCore.pyqtSignal(list)
+    file_found_signal = QtCore.pyqtSignal(list)
+    progress_signal = QtCore.pyqtSignal(FTPFile, dict)
 
-    def __init__(self, ftp_client: FTPClient):
+    def __init__(self, ftp_client: FTPClient, ftp_dirs: list = None):
         super().__init__()
         self.ftp_client = ftp_client
-
-    def __del__(self):
-        self.wait()
+        # ftp_dirs 가 주어지면 목록 조회와 다운로드를 동시에 진행
+        self.ftp_dirs = ftp_dirs
+        self.ftp_client.progress_callback = self.progress_signal.emit
 
     def run(self):
+        downloaded = BatchEmitter(self.download_complete_signal)
+        found = BatchEmitter(self.file_found_signal)
         try:
-            self.ftp_client.download(self.download_complete_signal)
+            if self.ftp_dirs:
+                self.ftp_client.mirror(self.ftp_dirs, downloaded, found)
+            else:
+                self.ftp_client.download(downloaded)
         except Exception as e:
             print(traceback.format_exc())
+        finally:
+            found.close()
+            downloaded.close()
 
 
 class MainWindow(QtWidgets.QMainWindow, mainwindow.Ui_MainWindow):
@@ -46,12 +147,22 @@ class MainWindow(QtWidgets.QMainWindow, mainwindow.Ui_MainWindow):
         self.pushButtonDownload.clicked.connect(self.download)
         self.pushButtonDownload.setEnabled(False)
         self.pushButtonCancel.clicked.connect(self.cancel)
+        self.pushButtonCancel.setEnabled(False)
+        self.pushButtonPause.clicked.connect(self.pause)
+        self.pushButtonPause.setEnabled(False)
+
+        self.ftp_client = None
+        self.ftp_thread = None
+        self.scan_thread = None
 
         # list view setting
-        self.to_download_model = QtGui.QStandardItemModel()
-        self.downloaded_model = QtGui.QStandardItemModel()
+        self.to_download_model = FileListModel("ftp_path", self)
+        self.downloaded_model = FileListModel("local_path", self)
         self.listViewFileToDownload.setModel(self.to_download_model)
         self.listViewDownloadComplete.setModel(self.downloaded_model)
+        # 항목 높이가 모두 같으므로 보이는 행만 계산
+        self.listViewFileToDownload.setUniformItemSizes(True)
+        self.listViewDownloadComplete.setUniformItemSizes(True)
 
         # set ftp cfg
         self.set_ftp_cfg("config.yml")
@@ -66,7 +177,9 @@ class MainWindow(QtWidgets.QMainWindow, mainwindow.Ui_MainWindow):
         self.progressBar.setValue(0)
 
         self.pushButtonApply.setEnabled(True)
-        self.pushButtonDownload.setEnabled(False)
+        # Apply 없이 Download 를 누르면 목록 조회와 다운로드를 함께 진행
+        self.pushButtonDownload.setEnabled(True)
+        self.applied = False
 
         # set config
         self.lineEditHost.setText(ftp_cfg["url"])
@@ -89,63 +202,159 @@ class MainWindow(QtWidgets.QMainWindow, mainwindow.Ui_MainWindow):
             configDialog.make_yaml(filename)
             self.set_ftp_cfg(filename)
 
+    def make_ftp_client(self) -> FTPClient:
+        self.close_post_processor()
+        # 접속 정보는 화면에서 수정한 값을 사용
+        ftp_cfg = dict(
+            self.ftp_cfg,
+            url=self.lineEditHost.text(),
+            username=self.lineEditUser.text(),
+            password=self.lineEditPassword.text(),
+        )
+        return FTPClient.from_cfg(ftp_cfg)
+
     def apply(self):
         """다운로드 할 목록 리스트 뷰에 추가"""
         # initialize list view widget
         self.to_download_model.clear()
         self.downloaded_model.clear()
+        self.progressBar.setMaximum(0)
+        self.progressBar.setValue(0)
 
-        url = self.lineEditHost.text()
-        username = self.lineEditUser.text()
-        password = self.lineEditPassword.text()
-
-        # ftp client setting
-        self.ftp_client = ftp_client = FTPClient(url, username, password)
-        if self.ftp_cfg["passive_mode"]:
-            ftp_client.set_passive_mode()
-        else:
-            ftp_client.set_active_mode()
-        ftp_client.pattern = self.ftp_cfg["pattern"]
+        self.ftp_client = self.make_ftp_client()
+        ftp_dirs = list(zip(self.ftp_cfg["remote_dirs"], self.ftp_cfg["local_dirs"]))
 
-        for remote_dir, local_dir in zip(
-            self.ftp_cfg["remote_dirs"], self.ftp_cfg["local_dirs"]
-        ):
-            self.ftp_client.apply_file_to_download(remote_dir, local_dir)
+        # 목록 조회는 작업 스레드에서 진행하고 찾은 파일은 묶어서 전달
+        self.scan_thread = scanThread(self.ftp_client, ftp_dirs)
+        self.scan_thread.files_found_signal.connect(self.append_file_to_download)
+        self.scan_thread.error_signal.connect(self.show_error)
+        self.scan_thread.finished.connect(self.apply_done)
+        self.scan_thread.start()
 
-        for ftp_file in self.ftp_client.file_to_download:
-            item = QtGui.QStandardItem(ftp_file.ftp_path)
-            self.to_download_model.appendRow(item)
+        self.pushButtonApply.setEnabled(False)
+        self.pushButtonDownload.setEnabled(False)
+        self.pushButtonCancel.setEnabled(True)
+        self.pushButtonPause.setEnabled(True)
 
-        self.progressBar.setMaximum(len(self.ftp_client.file_to_download))
-        self.progressBar.setValue(0)
+    def apply_done(self):
+        # 정렬 설정이 있으면 실제 다운로드 순서대로 표시
+        self.ftp_client.file_to_download.order = self.ftp_client.order
+        self.to_download_model.set_files(self.ftp_client.file_to_download)
+        self.progressBar.setMaximum(PROGRESS_SCALE)
 
-        self.pushButtonApply.setEnabled(False)
+        self.pushButtonApply.setEnabled(True)
         self.pushButtonDownload.setEnabled(True)
+        self.set_running(False)
+        self.applied = True
 
-        QtWidgets.QMessageBox.information(self, "Done!", "Apply Complete!")
+        if self.ftp_client.cancelled:
+            QtWidgets.QMessageBox.information(self, "Cancelled", "Apply Cancelled!")
+        else:
+            QtWidgets.QMessageBox.information(self, "Done!", "Apply Complete!")
 
     def download(self):
-        self.ftp_thread = ftpThread(self.ftp_client)
+        if self.applied:
+            self.ftp_thread = ftpThread(self.ftp_client)
+        else:
+            # 목록 조회 중에도 찾은 파일부터 바로 다운로드
+            self.to_download_model.clear()
+            self.downloaded_model.clear()
+            self.progressBar.setMaximum(0)
+            self.progressBar.setValue(0)
+
+            self.ftp_client = self.make_ftp_client()
+            ftp_dirs = list(
+                zip(self.ftp_cfg["remote_dirs"], self.ftp_cfg["local_dirs"])
+            )
+            self.ftp_thread = ftpThread(self.ftp_client, ftp_dirs)
+            self.ftp_thread.file_found_signal.connect(self.append_file_to_download)
 
         self.ftp_thread.download_complete_signal.connect(self.append_downloaded_file)
+        self.ftp_thread.progress_signal.connect(self.show_progress)
         self.ftp_thread.finished.connect(self.done)
         self.ftp_thread.start()
 
+        self.applied = False
         self.pushButtonDownload.setEnabled(False)
-        self.pushButtonApply.setEnabled(True)
+        self.pushButtonApply.setEnabled(False)
+        self.set_running(True)
 
     def cancel(self):
-        self.pushButtonDownload.setEnabled(False)
-        self.pushButtonApply.setEnabled(True)
-        self.progressBar.setValue(0)
+        """진행 중인 목록 조회/다운로드 중단, 받던 파일은 다음 Download 때 이어받기"""
+        if self.ftp_client is not None:
+            self.ftp_client.cancel()
+        self.pushButtonCancel.setEnabled(False)
+        self.pushButtonPause.setEnabled(False)
+
+    def pause(self):
+        if self.ftp_client is None:
+            return
 
-    def append_downloaded_file(self, ftp_file: FTPFile):
-        item = QtGui.QStandardItem(ftp_file.local_path)
-        self.downloaded_model.appendRow(item)
-        self.progressBar.setValue(self.progressBar.value() + 1)
+        if self.ftp_client.paused:
+            self.ftp_client.unpause()
+            self.pushButtonPause.setText("Pause")
+        else:
+            self.ftp_client.pause()
+            self.pushButtonPause.setText("Resume")
+
+    def set_running(self, running: bool):
+        self.pushButtonCancel.setEnabled(running)
+        self.pushButtonPause.setEnabled(running)
+        self.pushButtonPause.setText("Pause")
+
+    def append_file_to_download(self, ftp_files: list):
+        self.to_download_model.append_files(ftp_files)
+
+    def append_downloaded_file(self, ftp_files: list):
+        self.downloaded_model.append_files(ftp_files)
+
+    def show_error(self, message: str):
+        QtWidgets.QMessageBox.warning(self, "Error", message)
+
+    def show_progress(self, ftp_file: FTPFile, metrics: dict):
+        mib = 2 ** 20
+        message = "{:.1f} MiB, {:.2f} MiB/s (avg {:.2f} MiB/s)".format(
+            metrics["bytes_done"] / mib,
+            metrics["throughput"] / mib,
+            metrics["average_throughput"] / mib,
+        )
+        if metrics["eta"] is not None:
+            message += ", ETA {:.0f}s".format(metrics["eta"])
+        self.statusbar.showMessage(message)
+
+        # 크기를 아는 파일이 없으면 진행 중 표시(maximum 0)를 유지
+        if metrics["bytes_total"]:
+            received = metrics["bytes_done"] + metrics["bytes_skipped"]
+            self.progressBar.setMaximum(PROGRESS_SCALE)
+            self.progressBar.setValue(
+                min(PROGRESS_SCALE, PROGRESS_SCALE * received // metrics["bytes_total"])
+            )
 
     def done(self):
-        QtWidgets.QMessageBox.information(self, "Done!", "Download Complete!")
+        self.set_running(False)
+        self.pushButtonApply.setEnabled(True)
+        if self.ftp_client.cancelled:
+            # 남은 파일은 클라이언트 큐에 있으므로 Download 로 이어서 받음
+            self.to_download_model.set_files(self.ftp_client.file_to_download)
+            self.applied = True
+            self.pushButtonDownload.setEnabled(True)
+            QtWidgets.QMessageBox.information(self, "Cancelled", "Download Cancelled!")
+        else:
+            QtWidgets.QMessageBox.information(self, "Done!", "Download Complete!")
+
+    def closeEvent(self, event):
+        # 실행 중인 스레드를 중단하고 끝날 때까지 기다린 뒤 종료
+        for thread in (self.scan_thread, self.ftp_thread):
+            if thread is not None and thread.isRunning():
+                self.ftp_client.cancel()
+                thread.wait()
+        self.close_post_processor()
+        super().closeEvent(event)
+
+    def close_post_processor(self):
+        # 후처리 프로세스 풀 정리
+        if self.ftp_client is not None and self.ftp_client.post_processor is not None:
+            self.ftp_client.post_processor.close()
 
     def ftp_download(self):
         self.ftp_thread = ftpThread()
@@ -161,11 +370,12 @@ class ConfigDialog(QtWidgets.QDialog, config.Ui_Dialog):
     def __init__(self, parent=None, filename=None):
         super(ConfigDialog, self).__init__(parent)
         self.setupUi(self)
+        self.ftp_cfg = dict()
 
         if not filename:
             return
 
-        ftp_cfg = get_cfg(filename)
+        self.ftp_cfg = ftp_cfg = get_cfg(filename)
         self.lineEditHost.setText(ftp_cfg["url"])
         self.lineEditUsername.setText(ftp_cfg["username"])
         self.lineEditPassword.setText(ftp_cfg["password"])
@@ -178,6 +388,7 @@ class ConfigDialog(QtWidgets.QDialog, config.Ui_Dialog):
         self.lineEditFilePattern.setText(ftp_cfg["pattern"])
 
     def make_yaml(self, filepath: str):
+        # 다이얼로그에서 편집한 값만 바꾸고 다른 작업과 설정값은 그대로 유지
         ftp_cfg = dict()
         ftp_cfg["url"] = self.lineEditHost.text()
         ftp_cfg["username"] = self.lineEditUsername.text()
@@ -192,13 +403,12 @@ class ConfigDialog(QtWidgets.QDialog, config.Ui_Dialog):
         ftp_cfg["local_dirs"] = self.textEditLocalDirs.toPlainText().split("\n")
         ftp_cfg["pattern"] = self.lineEditFilePattern.text()
 
-        config = dict(ftp=ftp_cfg)
-
-        with open(filepath, "w") as f:
-            yaml.dump(config, f)
+        save_cfg(filepath, ftp_cfg)
 
 
 if __name__ == "__main__":
+    # 후처리 프로세스 풀이 패키징된 실행 파일에서도 동작하도록
+    multiprocessing.freeze_support()
     appctxt = ApplicationContext()
     window = MainWindow()
     window.show()
@@ -0,0 +1,88 @@
+"""
+in-process pyftpdlib server for the tests that talk ftp
+"""
+import os
+import logging
+import threading
+
+try:
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler, ThrottledDTPHandler
+    from pyftpdlib.servers import ThreadedFTPServer
+    HAS_PYFTPDLIB = True
+except ImportError:
+    FTPHandler = object
+    HAS_PYFTPDLIB = False
+
+
+class NoMLSDHandler(FTPHandler):
+    """ vsftpd 처럼 MLSD 가 없고 OPTS MLST 에 501 로 답하는 서버 """
+    if HAS_PYFTPDLIB:
+        proto_cmds = {
+            cmd: info for cmd, info in FTPHandler.proto_cmds.items()
+            if cmd not in ('MLSD', 'MLST')}
+
+    def ftp_OPTS(self, line):
+        self.respond('501 Option not understood.')
+
+
+def throttled(handler, write_limit: int):
+    """ `handler` whose data connections send at most `write_limit` bytes per second """
+    dtp_handler = type('DTPHandler', (ThrottledDTPHandler,), dict(write_limit=write_limit))
+    # sendfile 은 속도 제한을 거치지 않음
+    return type('ThrottledHandler', (handler,), dict(dtp_handler=dtp_handler, use_sendfile=False))
+
+
+def counting(handler):
+    """
+    `handler` recording the number of open control connections,
+    read `handler.peak` for the most seen at once
+    """
+    lock = threading.Lock()
+
+    class CountingHandler(handler):
+        current = 0
+        peak = 0
+
+        def on_connect(self):
+            with lock:
+                CountingHandler.current += 1
+                CountingHandler.peak = max(CountingHandler.peak, CountingHandler.current)
+            super().on_connect()
+
+        def on_disconnect(self):
+            with lock:
+                CountingHandler.current -= 1
+            super().on_disconnect()
+
+    return CountingHandler
+
+
+def make_tree(root: str, files: dict) -> None:
+    """ :param dict files: relative path -> bytes """
+    for path, data in files.items():
+        full_path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(data)
+
+
+def start_server(root: str, handler=None) -> tuple:
+    """
+    serve `root` to anonymous on 127.0.0.1
+
+    :return: (server, port), stop with `server.close_all()`
+    """
+    handler = type('Handler', (handler or FTPHandler,), dict())
+    authorizer = DummyAuthorizer()
+    authorizer.add_anonymous(root)
+    handler.authorizer = authorizer
+
+    pyftpdlib_logger = logging.getLogger('pyftpdlib')
+    pyftpdlib_logger.addHandler(logging.NullHandler())
+    pyftpdlib_logger.propagate = False
+
+    server = ThreadedFTPServer(('127.0.0.1', 0), handler)
+    # 종료 이벤트가 클래스 속성이라 늦게 끝난 이전 서버가 close_all 을 부르면 다음 서버의 연결까지 끊김
+    threading.Thread(target=server.serve_forever, kwargs=dict(handle_exit=False), daemon=True).start()
+    return server, server.socket.getsockname()[1]
@@ -0,0 +1,228 @@
+import os
+import random
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+from ftp.aio import AsyncFTPClient, AsyncFTPSession
+from ftp_server import HAS_PYFTPDLIB, NoMLSDHandler, make_tree, start_server
+
+DATA = random.Random(0).randbytes(200000)
+FILES = {
+    'a/one.zip': DATA,
+    'a/b/two.zip': b'two',
+    'c.txt': b'c',
+    '한글/파일.zip': b'hangul',
+    'café.zip': b'cafe',
+}
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestAsyncFTPClient(unittest.TestCase):
+
+    handler = None
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'root')
+        self.local_dir = os.path.join(self.temp_dir.name, 'local')
+        make_tree(self.root, FILES)
+        self.server, self.port = start_server(self.root, self.handler)
+
+    def tearDown(self):
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def _client(self) -> AsyncFTPClient:
+        ftp_client = AsyncFTPClient('127.0.0.1', 'anonymous', 'test@', self.port)
+        ftp_client.workers = 2
+        ftp_client.blocksize = 8192
+        ftp_client.timeout = 10
+        return ftp_client
+
+    def _local(self, path: str) -> bytes:
+        with open(os.path.join(self.local_dir, path), 'rb') as f:
+            return f.read()
+
+    def test_list(self):
+        ftp_client = self._client()
+        ftp_client.pattern = r'\.zip$'
+        count = asyncio.run(ftp_client.apply_file_to_download('/', self.local_dir))
+
+        self.assertEqual(count, 4)
+        sizes = {f.ftp_path: f.size for f in ftp_client.file_to_download}
+        self.assertEqual(sizes, {
+            '/a/one.zip': len(DATA), '/a/b/two.zip': 3, '/한글/파일.zip': 6, '/café.zip': 4})
+        self.assertTrue(ftp_client._use_mlsd)
+
+    def test_symlinks(self):
+        os.symlink(os.path.join(self.root, 'a', 'b'), os.path.join(self.root, 'b_link'))
+        os.symlink(os.path.join(self.root, 'c.txt'), os.path.join(self.root, 'c_link.txt'))
+        ftp_client = self._client()
+        ftp_client.pattern = 'two|c_link'
+        asyncio.run(ftp_client.apply_file_to_download('/', self.local_dir))
+
+        # 디렉터리를 가리키는 링크는 내려가고 나머지 링크는 파일로 받음
+        self.assertEqual(
+            sorted(f.ftp_path for f in ftp_client.file_to_download),
+            ['/a/b/two.zip', '/b_link/two.zip', '/c_link.txt'])
+
+    def test_relative_dir_after_link_probe(self):
+        os.symlink(os.path.join(self.root, 'a', 'b'), os.path.join(self.root, 'b_link'))
+        ftp_client = self._client()
+        ftp_client.workers = 1
+        ftp_client.pattern = 'one'
+
+        async def run():
+            # 같은 세션으로 링크를 확인한 뒤 상대 경로를 조회
+            await ftp_client.connect()
+            try:
+                await ftp_client.apply_file_to_download('/', self.local_dir)
+                await ftp_client.apply_file_to_download('a', os.path.join(self.local_dir, 'rel'))
+            finally:
+                await ftp_client.disconnect()
+        asyncio.run(run())
+
+        self.assertEqual(
+            sorted(f.ftp_path for f in ftp_client.file_to_download), ['/a/one.zip', 'a/one.zip'])
+
+    def test_download(self):
+        ftp_client = self._client()
+
+        async def run():
+            await ftp_client.apply_file_to_download('/', self.local_dir)
+            await ftp_client.download()
+        asyncio.run(run())
+
+        self.assertEqual(ftp_client.file_failed, [])
+        self.assertEqual(len(ftp_client.file_downloaded), len(FILES))
+        for path, data in FILES.items():
+            self.assertEqual(self._local(path), data)
+
+    def test_short_writes(self):
+        real_open = open
+
+        class ShortWriter:
+            """ unbuffered file accepting at most 1000 bytes per write """
+
+            def __init__(self, f):
+                self.f = f
+
+            def write(self, data):
+                return self.f.write(data[:1000])
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                self.f.close()
+
+        ftp_client = self._client()
+        ftp_client.pattern = 'one'
+
+        async def run():
+            await ftp_client.apply_file_to_download('/', self.local_dir)
+            await ftp_client.download()
+        def short_open(*args, **kwargs):
+            return ShortWriter(real_open(*args, **kwargs))
+        with mock.patch('ftp.aio.open', short_open, create=True):
+            asyncio.run(run())
+
+        self.assertEqual(self._local('a/one.zip'), DATA)
+
+    def test_non_ascii_names(self):
+        ftp_client = self._client()
+        ftp_client.pattern = '파일|é'
+
+        async def run():
+            await ftp_client.apply_file_to_download('/', self.local_dir)
+            await ftp_client.download()
+        asyncio.run(run())
+
+        self.assertEqual(
+            sorted(f.ftp_path for f in ftp_client.file_downloaded), ['/café.zip', '/한글/파일.zip'])
+        self.assertEqual(self._local('한글/파일.zip'), b'hangul')
+        self.assertEqual(self._local('café.zip'), b'cafe')
+
+    def test_resume(self):
+        os.makedirs(os.path.join(self.local_dir, 'a'))
+        with open(os.path.join(self.local_dir, 'a', 'one.zip.part'), 'wb') as f:
+            f.write(DATA[:50000])
+        ftp_client = self._client()
+
+        async def run():
+            await ftp_client.apply_file_to_download('/a', os.path.join(self.local_dir, 'a'))
+            await ftp_client.download()
+        asyncio.run(run())
+
+        self.assertEqual(self._local('a/one.zip'), DATA)
+        snapshot = ftp_client.metrics.snapshot()
+        self.assertEqual(snapshot['bytes_skipped'], 50000)
+        self.assertEqual(snapshot['bytes_done'], len(DATA) - 50000 + 3)
+
+    def test_mirror_small_queue(self):
+        ftp_client = self._client()
+        ftp_client.queue_size = 1
+        found = list()
+
+        class Signal:
+            def emit(self, ftp_file):
+                found.append(ftp_file.ftp_path)
+
+        # 겹치는 디렉터리의 파일은 한 번만 받음
+        asyncio.run(ftp_client.mirror(
+            [('/', self.local_dir), ('/a', os.path.join(self.local_dir, 'a'))],
+            found_signal=Signal()))
+
+        self.assertEqual(ftp_client.file_failed, [])
+        self.assertEqual(len(found), len(FILES))
+        self.assertEqual([f.ftp_path for f in ftp_client.file_downloaded], found)
+        for path, data in FILES.items():
+            self.assertEqual(self._local(path), data)
+
+
+class TestAsyncFTPSession(unittest.TestCase):
+
+    def test_listing_timeout_is_per_read(self):
+        session = AsyncFTPSession('127.0.0.1', timeout=0.2)
+
+        async def run():
+            reader = asyncio.StreamReader()
+
+            async def feed():
+                # 전체 1초 동안 0.1초마다 한 줄씩 보냄
+                for i in range(10):
+                    await asyncio.sleep(0.1)
+                    reader.feed_data(f'line{i}\r\n'.encode())
+                reader.feed_eof()
+
+            async def transfer(line, rest=None):
+                asyncio.ensure_future(feed())
+                return reader, mock.Mock()
+
+            async def reply(expect='2'):
+                return '226 Transfer complete.'
+
+            with mock.patch.object(session, 'transfer', transfer), \
+                    mock.patch.object(session, 'reply', reply):
+                return await session.lines('LIST /')
+
+        self.assertEqual(asyncio.run(run()), [f'line{i}' for i in range(10)])
+
+
+class TestAsyncFTPClientWithoutMLSD(TestAsyncFTPClient):
+    """ same tests against a server that only knows LIST """
+
+    handler = NoMLSDHandler
+
+    def test_list(self):
+        ftp_client = self._client()
+        count = asyncio.run(ftp_client.apply_file_to_download('/', self.local_dir))
+
+        self.assertEqual(count, len(FILES))
+        self.assertFalse(ftp_client._use_mlsd)
+
+
+if __name__ == '__main__':
+    unittest.main()
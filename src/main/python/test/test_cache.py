@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from ftp.cache import ListingCache
+from ftp.listing import FTPEntry
+
+ENTRIES = [FTPEntry('a.zip', 'file', 10, 1583064000.0), FTPEntry('B', 'dir', None, None)]
+
+
+class TestListingCache(unittest.TestCase):
+
+    def test_fresh_entry_and_changed_mtime(self):
+        cache = ListingCache(ttl=3600)
+        key = ListingCache.make_key('host', 21, '/data/')
+        self.assertEqual(key, 'host:21/data')
+        self.assertIsNone(cache.get(key))
+
+        cache.put(key, ENTRIES, dir_mtime=100.0)
+        self.assertEqual(cache.get(key), ENTRIES)
+        self.assertEqual(cache.get(key, dir_mtime=100.0), ENTRIES)
+        # 상위 목록의 수정 시각이 바뀌면 유효 기간과 관계 없이 다시 조회
+        self.assertIsNone(cache.get(key, dir_mtime=200.0))
+
+    def test_expired_entry_needs_same_mtime(self):
+        cache = ListingCache(ttl=0)
+        cache.put('a', ENTRIES, dir_mtime=100.0)
+        cache.put('b', ENTRIES)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', dir_mtime=100.0), ENTRIES)
+        self.assertIsNone(cache.get('b', dir_mtime=100.0))
+
+    def test_lru_eviction(self):
+        cache = ListingCache(max_entries=2)
+        cache.put('a', ENTRIES)
+        cache.put('b', ENTRIES)
+        cache.get('a')
+        cache.put('c', ENTRIES)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_invalidate_prefix(self):
+        cache = ListingCache()
+        cache.put('host:21/a', ENTRIES)
+        cache.put('host:21/a/b', ENTRIES)
+        cache.put('host:21/c', ENTRIES)
+        cache.invalidate('host:21/a')
+
+        self.assertIsNone(cache.get('host:21/a/b'))
+        self.assertIsNotNone(cache.get('host:21/c'))
+
+    def test_json_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'cache.json')
+            cache = ListingCache(path)
+            cache.put('a', ENTRIES, dir_mtime=100.0)
+            cache.save()
+
+            loaded = ListingCache(path)
+            self.assertEqual(loaded.get('a', dir_mtime=100.0), ENTRIES)
+            self.assertIsInstance(loaded.get('a')[0], FTPEntry)
+
+            with open(path, 'w') as f:
+                f.write('{broken')
+            self.assertIsNone(ListingCache(path).get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
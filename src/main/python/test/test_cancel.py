@@ -0,0 +1,129 @@
+import os
+import time
+import random
+import tempfile
+import threading
+import unittest
+
+from ftp.ftp_client import FTPClient
+from ftp.pool import FTPConnectionPool
+from ftp_server import HAS_PYFTPDLIB, make_tree, start_server, throttled
+
+if HAS_PYFTPDLIB:
+    from pyftpdlib.handlers import FTPHandler
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestCancel(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'root')
+        self.local_dir = os.path.join(self.temp_dir.name, 'local')
+        self.data = random.Random(0).randbytes(1000000)
+        make_tree(self.root, {'a/big.zip': self.data, 'b/small.zip': b's' * 10})
+        # 처음 200KB 이후로는 천천히 보내 전송 중에 취소/일시 정지할 시간을 확보
+        self.handler = throttled(FTPHandler, 100000)
+        self.server, self.port = start_server(self.root, self.handler)
+        self.pool = FTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def _client(self) -> FTPClient:
+        ftp_client = FTPClient('127.0.0.1', 'anonymous', 'test@', self.port)
+        ftp_client.pool = self.pool
+        ftp_client.blocksize = 8192
+        return ftp_client
+
+    def _unthrottle(self) -> None:
+        self.handler.dtp_handler.write_limit = 0
+
+    def _start(self, target, *args) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def _wait_for_bytes(self, ftp_client: FTPClient) -> None:
+        deadline = time.monotonic() + 5
+        while ftp_client.metrics.snapshot()['bytes_done'] < 50000:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_cancel_keeps_partial_and_requeues(self):
+        ftp_client = self._client()
+        ftp_client.apply_file_to_download('/a', self.local_dir)
+        thread = self._start(ftp_client.download)
+        self._wait_for_bytes(ftp_client)
+        ftp_client.cancel()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(ftp_client.cancelled)
+        self.assertEqual(ftp_client.file_downloaded, [])
+        self.assertEqual(ftp_client.file_failed, [])
+        self.assertEqual([f.ftp_path for f in ftp_client.file_to_download], ['/a/big.zip'])
+        partial = os.path.getsize(os.path.join(self.local_dir, 'big.zip.part'))
+        self.assertTrue(0 < partial < len(self.data))
+
+        # 다시 download 하면 남은 부분만 받음
+        self._unthrottle()
+        ftp_client.download()
+        self.assertEqual(len(ftp_client.file_downloaded), 1)
+        with open(os.path.join(self.local_dir, 'big.zip'), 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertGreaterEqual(ftp_client.metrics.snapshot()['bytes_skipped'], partial)
+
+    def test_pause_and_resume(self):
+        ftp_client = self._client()
+        ftp_client.apply_file_to_download('/a', self.local_dir)
+        thread = self._start(ftp_client.download)
+        self._wait_for_bytes(ftp_client)
+        ftp_client.pause()
+        self.assertTrue(ftp_client.paused)
+
+        # 일시 정지 직전에 받던 블록이 기록될 시간을 준 뒤에는 더 받지 않음
+        time.sleep(0.2)
+        paused_bytes = ftp_client.metrics.snapshot()['bytes_done']
+        time.sleep(0.5)
+        self.assertEqual(ftp_client.metrics.snapshot()['bytes_done'], paused_bytes)
+        self.assertLess(paused_bytes, len(self.data))
+
+        self._unthrottle()
+        ftp_client.unpause()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(ftp_client.file_downloaded), 1)
+
+    def test_cancel_while_paused(self):
+        ftp_client = self._client()
+        ftp_client.apply_file_to_download('/a', self.local_dir)
+        thread = self._start(ftp_client.download)
+        self._wait_for_bytes(ftp_client)
+        ftp_client.pause()
+        time.sleep(0.1)
+        ftp_client.cancel()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(ftp_client.file_to_download), 1)
+
+    def test_cancel_mirror(self):
+        ftp_client = self._client()
+        ftp_client.workers = 2
+        thread = self._start(ftp_client.mirror, [('/', self.local_dir)])
+        self._wait_for_bytes(ftp_client)
+        ftp_client.cancel()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        done = {f.ftp_path for f in ftp_client.file_downloaded}
+        left = {f.ftp_path for f in ftp_client.file_to_download}
+        self.assertIn('/a/big.zip', left)
+        self.assertEqual(done | left, {'/a/big.zip', '/b/small.zip'})
+
+
+if __name__ == '__main__':
+    unittest.main()
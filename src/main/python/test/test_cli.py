@@ -0,0 +1,116 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+import contextlib
+
+from ftp.cli import EXIT_OK, EXIT_FAILED_FILES, EXIT_ERROR, main
+from ftp_server import HAS_PYFTPDLIB, make_tree, start_server
+
+if HAS_PYFTPDLIB:
+    from pyftpdlib.handlers import FTPHandler
+
+    class NoRETRHandler(FTPHandler):
+        """ lists files but refuses to send `b.zip` """
+
+        def ftp_RETR(self, file):
+            if file.endswith('b.zip'):
+                self.respond('550 Not allowed.')
+                return
+            return super().ftp_RETR(file)
+
+
+class _CliTestCase(unittest.TestCase):
+    """ runs `main` against a pyftpdlib server serving a.zip and b.zip """
+
+    handler = None
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'root')
+        self.local_dir = os.path.join(self.temp_dir.name, 'local')
+        make_tree(self.root, {'a.zip': b'a', 'b.zip': b'b'})
+        self.server, self.port = start_server(self.root, self.handler)
+
+    def tearDown(self):
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def _config(self, text: str) -> str:
+        config_file = os.path.join(self.temp_dir.name, 'config.yml')
+        with open(config_file, 'w') as f:
+            f.write(text)
+        return config_file
+
+    def _ftp_block(self, **extra) -> str:
+        lines = [
+            'ftp:', '  url: 127.0.0.1', f'  port: {self.port}',
+            '  username: anonymous', '  password: test@', '  max_retries: 0',
+            '  remote_dirs: [/]', f'  local_dirs: [{self.local_dir}]']
+        lines.extend(f'  {key}: {value}' for key, value in extra.items())
+        return '\n'.join(lines) + '\n'
+
+    def _main(self, *args) -> tuple:
+        """ :return: (exit code, json summaries printed) """
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = main([*args, '--json'])
+        return exit_code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestCli(_CliTestCase):
+
+    def test_ok(self):
+        exit_code, summaries = self._main(self._config(self._ftp_block()))
+
+        self.assertEqual(exit_code, EXIT_OK)
+        summary, = summaries
+        self.assertEqual(summary['status'], 'ok')
+        self.assertEqual(summary['url'], '127.0.0.1')
+        self.assertEqual(
+            (summary['found'], summary['downloaded'], summary['failed']), (2, 2, 0))
+        self.assertEqual(summary['metrics']['bytes_done'], 2)
+        self.assertIn('elapsed', summary)
+        self.assertTrue(os.path.exists(os.path.join(self.local_dir, 'b.zip')))
+
+    def test_pipeline_and_asyncio(self):
+        config_file = self._config(self._ftp_block())
+        for option in ('--pipeline', '--asyncio'):
+            exit_code, summaries = self._main(config_file, option)
+            self.assertEqual(exit_code, EXIT_OK)
+            self.assertEqual(summaries[0]['downloaded'], 2)
+
+    def test_config_errors(self):
+        missing = os.path.join(self.temp_dir.name, 'missing.yml')
+        exit_code, summaries = self._main(missing)
+        self.assertEqual(exit_code, EXIT_ERROR)
+        self.assertEqual(summaries[0]['status'], 'error')
+
+        # 잘못된 작업이 있어도 다른 작업은 실행하고 모두 보고
+        config_file = self._config(
+            self._ftp_block() + 'jobs:\n- name: good\n- name: no-dirs\n  remote_dirs: null\n')
+        exit_code, summaries = self._main(config_file)
+        self.assertEqual(exit_code, EXIT_ERROR)
+        self.assertEqual(
+            [(summary['job'], summary['status']) for summary in summaries],
+            [('good', 'ok'), ('no-dirs', 'error')])
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestCliFailedFiles(_CliTestCase):
+
+    handler = NoRETRHandler if HAS_PYFTPDLIB else None
+
+    def test_failed_files(self):
+        exit_code, summaries = self._main(self._config(self._ftp_block()))
+
+        self.assertEqual(exit_code, EXIT_FAILED_FILES)
+        summary, = summaries
+        self.assertEqual(summary['status'], 'failed')
+        self.assertEqual((summary['downloaded'], summary['failed']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+import os
+import time
+import random
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+from ftp.ftp_client import FTPClient
+from ftp.pool import FTPConnectionPool
+from ftp.postprocess import PostProcessor, parse_steps
+from ftp.retry import RetryPolicy
+from ftp_server import HAS_PYFTPDLIB, counting, make_tree, start_server, throttled
+
+if HAS_PYFTPDLIB:
+    from pyftpdlib.handlers import FTPHandler
+
+
+def failing_rest(handler, offset: int):
+    """ `handler` refusing RETR from `offset` """
+
+    class FailingHandler(handler):
+
+        def ftp_RETR(self, file):
+            if self._restart_position == offset:
+                self._restart_position = 0
+                self.respond('550 Segment refused.')
+                return
+            return super().ftp_RETR(file)
+
+    return FailingHandler
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'root')
+        self.local_dir = os.path.join(self.temp_dir.name, 'local')
+        self.data = random.Random(0).randbytes(300000)
+        make_tree(self.root, {'big.zip': self.data})
+        self.server, self.port = start_server(self.root)
+        self.pool = FTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def _client(self) -> FTPClient:
+        ftp_client = FTPClient('127.0.0.1', 'anonymous', 'test@', self.port)
+        ftp_client.pool = self.pool
+        ftp_client.blocksize = 8192
+        ftp_client.apply_file_to_download('/', self.local_dir)
+        return ftp_client
+
+    def _local(self) -> bytes:
+        with open(os.path.join(self.local_dir, 'big.zip'), 'rb') as f:
+            return f.read()
+
+    def _write_part(self, data: bytes) -> None:
+        os.makedirs(self.local_dir, exist_ok=True)
+        with open(os.path.join(self.local_dir, 'big.zip.part'), 'wb') as f:
+            f.write(data)
+
+    def test_resume_from_partial(self):
+        self._write_part(self.data[:100000])
+        ftp_client = self._client()
+        ftp_client.download()
+
+        self.assertEqual(self._local(), self.data)
+        snapshot = ftp_client.metrics.snapshot()
+        self.assertEqual((snapshot['bytes_skipped'], snapshot['bytes_done']), (100000, 200000))
+
+    def test_full_size_part_is_downloaded_again(self):
+        # 분할 다운로드 중 중단되어 남은 빈 구간이 있는 파일과 구분할 수 없음
+        self._write_part(bytes(len(self.data)))
+        ftp_client = self._client()
+        ftp_client.download()
+
+        self.assertEqual(self._local(), self.data)
+        self.assertEqual(ftp_client.metrics.snapshot()['bytes_done'], len(self.data))
+
+    def test_segmented(self):
+        ftp_client = self._client()
+        ftp_client.segment_threshold = 1
+        ftp_client.segment_count = 3
+        ftp_client.verify = ['size', 'sha256']
+        ftp_client.download()
+
+        self.assertEqual(len(ftp_client.file_downloaded), 1)
+        self.assertEqual(self._local(), self.data)
+        self.assertEqual(os.listdir(self.local_dir), ['big.zip'])
+
+    def test_segmented_leftover_is_discarded(self):
+        os.makedirs(self.local_dir)
+        with open(os.path.join(self.local_dir, 'big.zip.seg'), 'wb') as f:
+            f.truncate(len(self.data))
+
+        ftp_client = self._client()
+        ftp_client.segment_threshold = 1
+        ftp_client.download()
+
+        self.assertEqual(self._local(), self.data)
+        self.assertEqual(ftp_client.metrics.snapshot()['bytes_done'], len(self.data))
+
+    def test_failed_segment_stops_the_others(self):
+        self.server.close_all()
+        # 마지막 구간만 실패하고 나머지 구간은 천천히 전송
+        self.server, self.port = start_server(
+            self.root, failing_rest(throttled(FTPHandler, 20000), 225000))
+        ftp_client = self._client()
+        ftp_client.segment_threshold = 1
+        ftp_client.segment_count = 4
+        ftp_client.retry_policy = RetryPolicy(max_retries=0)
+
+        started = time.monotonic()
+        ftp_client.download()
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(len(ftp_client.file_failed), 1)
+        self.assertIn('550', ftp_client.file_failed[0].error)
+        self.assertLess(ftp_client.metrics.snapshot()['bytes_done'], len(self.data) * 3 // 4)
+
+    def test_verify_size_with_preallocate(self):
+        ftp_client = self._client()
+        ftp_client.resume = False
+        ftp_client.preallocate = True
+        ftp_client.verify = ['size']
+        ftp_client.retry_policy = RetryPolicy(max_retries=0)
+        # 목록의 크기가 실제보다 크면 미리 할당한 파일 크기만 원격 크기와 같아짐
+        next(iter(ftp_client.file_to_download)).size = len(self.data) + 100
+        ftp_client.download()
+
+        self.assertEqual(len(ftp_client.file_failed), 1)
+        self.assertIn('ChecksumError', ftp_client.file_failed[0].error)
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestTree(unittest.TestCase):
+    """ scan and download a tree of directories """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'root')
+        self.local_dir = os.path.join(self.temp_dir.name, 'local')
+        self.files = {
+            f'd{i}/e{j}/f{k}.zip': f'{i}{j}{k}'.encode() * 1000
+            for i in range(3) for j in range(3) for k in range(3)}
+        self.files.update({'top.zip': b'top', 'd1/mid.zip': b'mid'})
+        make_tree(self.root, self.files)
+        self.handler = counting(FTPHandler)
+        self.server, self.port = start_server(self.root, self.handler)
+        self.pool = FTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def _client(self) -> FTPClient:
+        ftp_client = FTPClient('127.0.0.1', 'anonymous', 'test@', self.port)
+        ftp_client.pool = self.pool
+        return ftp_client
+
+    def _assert_all_downloaded(self, ftp_client: FTPClient) -> None:
+        self.assertEqual(ftp_client.file_failed, [])
+        self.assertEqual(len(ftp_client.file_downloaded), len(self.files))
+        for path, data in self.files.items():
+            with open(os.path.join(self.local_dir, path), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_download_with_workers(self):
+        ftp_client = self._client()
+        ftp_client.workers = 3
+        ftp_client.apply_file_to_download('/', self.local_dir)
+        queued = [ftp_file.ftp_path for ftp_file in ftp_client.file_to_download]
+        ftp_client.download()
+
+        self._assert_all_downloaded(ftp_client)
+        # 완료 순서와 관계 없이 큐에 들어간 순서대로 결과를 남김
+        self.assertEqual([ftp_file.ftp_path for ftp_file in ftp_client.file_downloaded], queued)
+        self.assertEqual(len(ftp_client.file_to_download), 0)
+
+    def test_sync_skips_unchanged_files(self):
+        self._client().mirror([('/', self.local_dir)])
+
+        # 크기가 바뀐 파일과 크기는 같지만 서버에서 더 최근에 바뀐 파일
+        self.files.update({'top.zip': b'top!', 'd1/mid.zip': b'MID'})
+        make_tree(self.root, {'top.zip': b'top!', 'd1/mid.zip': b'MID'})
+        newer = time.time() + 3600
+        os.utime(os.path.join(self.root, 'd1', 'mid.zip'), (newer, newer))
+
+        ftp_client = self._client()
+        ftp_client.sync = True
+        ftp_client.apply_file_to_download('/', self.local_dir)
+        self.assertEqual(
+            sorted(ftp_file.ftp_path for ftp_file in ftp_client.file_to_download),
+            ['/d1/mid.zip', '/top.zip'])
+
+        ftp_client.download()
+        for path, data in self.files.items():
+            with open(os.path.join(self.local_dir, path), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_crawler_max_depth_and_dir_filter(self):
+        ftp_client = self._client()
+        ftp_client.workers = 2
+        ftp_client.max_depth = 1
+        ftp_client.apply_file_to_download('/', self.local_dir)
+        self.assertEqual(
+            sorted(ftp_file.ftp_path for ftp_file in ftp_client.file_to_download),
+            ['/d1/mid.zip', '/top.zip'])
+
+        ftp_client = self._client()
+        ftp_client.workers = 2
+        ftp_client.dir_filter = lambda ftp_path: ftp_path not in ('/d0', '/d1/e2')
+        ftp_client.apply_file_to_download('/', self.local_dir)
+        expected = sorted(
+            f'/{path}' for path in self.files
+            if not path.startswith(('d0/', 'd1/e2/')))
+        self.assertEqual(
+            sorted(ftp_file.ftp_path for ftp_file in ftp_client.file_to_download), expected)
+
+    def test_mirror(self):
+        found = list()
+        done = list()
+
+        class Signal:
+            def __init__(self, paths: list):
+                self.paths = paths
+
+            def emit(self, ftp_file):
+                self.paths.append(ftp_file.ftp_path)
+
+        ftp_client = self._client()
+        # 겹치는 디렉터리의 파일은 한 번만 받음
+        ftp_client.mirror(
+            [('/', self.local_dir), ('/d1', os.path.join(self.local_dir, 'd1'))],
+            signal=Signal(done), found_signal=Signal(found))
+
+        self._assert_all_downloaded(ftp_client)
+        self.assertEqual(sorted(found), sorted(f'/{path}' for path in self.files))
+        self.assertEqual(sorted(done), sorted(found))
+        self.assertEqual([ftp_file.ftp_path for ftp_file in ftp_client.file_downloaded], found)
+        self.assertEqual(ftp_client.metrics.snapshot()['files_done'], len(self.files))
+
+    def test_mirror_stays_within_workers(self):
+        ftp_client = self._client()
+        ftp_client.workers = 2
+        ftp_client.mirror([('/', self.local_dir)])
+
+        self._assert_all_downloaded(ftp_client)
+        # 목록 조회와 다운로드가 같은 세션 예산을 나눠 씀
+        self.assertLessEqual(self.handler.peak, 2)
+
+    def test_post_process_submit_error_keeps_worker(self):
+        ftp_client = self._client()
+        ftp_client.post_processor = PostProcessor(parse_steps(['checksum']))
+
+        def submit(path):
+            raise BrokenProcessPool('pool is broken')
+        ftp_client.post_processor.submit = submit
+        ftp_client.mirror([('/', self.local_dir)])
+
+        self.assertEqual(len(ftp_client.file_downloaded), len(self.files))
+        self.assertEqual(len(ftp_client.post_processor.errors), len(self.files))
+        self.assertIn('BrokenProcessPool', ftp_client.post_processor.errors[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from ftp.ftp_file import FTPFile
+from ftp.download_queue import DownloadQueue
+
+
+def make_file(ftp_path, size=None, mtime=None):
+    return FTPFile(ftp_path, f'/tmp/download{ftp_path}', size, mtime)
+
+
+class TestDownloadQueue(unittest.TestCase):
+
+    def test_fifo_and_dedup(self):
+        download_queue = DownloadQueue()
+        self.assertEqual(download_queue.extend(
+            [make_file('/a'), make_file('/b'), make_file('/a')]), 2)
+        self.assertIn('/a', download_queue)
+        self.assertEqual(len(download_queue), 2)
+        self.assertEqual(download_queue.pop().ftp_path, '/a')
+        # 꺼낸 파일은 다시 넣을 수 있음
+        self.assertTrue(download_queue.push(make_file('/a')))
+        self.assertEqual([f.ftp_path for f in download_queue], ['/b', '/a'])
+
+    def test_size_order_unknown_last(self):
+        download_queue = DownloadQueue('smallest_first')
+        download_queue.extend([make_file('/a', 30), make_file('/b'), make_file('/c', 10)])
+        self.assertEqual([f.ftp_path for f in download_queue], ['/c', '/a', '/b'])
+
+        download_queue.order = 'largest_first'
+        popped = [download_queue.pop().ftp_path for _ in range(len(download_queue))]
+        self.assertEqual(popped, ['/a', '/c', '/b'])
+        self.assertFalse(download_queue)
+
+    def test_mtime_and_directory_order(self):
+        files = [make_file('/y/1', mtime=3), make_file('/x/2', mtime=1), make_file('/y/0', mtime=2)]
+        self.assertEqual(
+            [f.ftp_path for f in self._ordered('newest_first', files)],
+            ['/y/1', '/y/0', '/x/2'])
+        self.assertEqual(
+            [f.ftp_path for f in self._ordered('directory', files)], ['/x/2', '/y/0', '/y/1'])
+
+    def test_unknown_order(self):
+        with self.assertRaises(ValueError):
+            DownloadQueue('random')
+
+    @staticmethod
+    def _ordered(order, files):
+        download_queue = DownloadQueue(order)
+        download_queue.extend(files)
+        return list(download_queue)
+
+
+class TestFTPFile(unittest.TestCase):
+
+    def test_lazy_paths(self):
+        ftp_file = FTPFile('/a/b.zip', '/tmp/x/b.zip')
+        self.assertEqual(ftp_file.local_dir, '/tmp/x')
+        self.assertEqual(ftp_file.temp_path, '/tmp/x/b.zip.part')
+        with self.assertRaises(AttributeError):
+            ftp_file.other = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from ftp.ftp_file import FTPFile
+from ftp.journal import JobJournal, QUEUED, IN_PROGRESS, DONE
+
+
+class TestJobJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'journal.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _files(self):
+        return [FTPFile(f'/data/{name}', f'/tmp/download/{name}', 10, 1.0) for name in 'abc']
+
+    def test_resume_unfinished_after_listing(self):
+        journal = JobJournal(self.path)
+        self.assertIsNone(journal.unfinished('/data'))
+        journal.start_listing('/data')
+        a, b, c = self._files()
+        for ftp_file in (a, b, c):
+            journal.record(ftp_file, QUEUED, root='/data')
+        journal.finish_listing('/data')
+        journal.record(a, DONE, offset=10)
+        journal.record(b, IN_PROGRESS, offset=4)
+        journal.add_bytes(b.ftp_path, 3)
+        journal.close()
+
+        journal = JobJournal(self.path)
+        self.assertEqual(journal.counts(), {DONE: 1, IN_PROGRESS: 1, QUEUED: 1})
+        offset = journal._db.execute(
+            'SELECT byte_offset FROM files WHERE ftp_path = ?', (b.ftp_path,)).fetchone()[0]
+        self.assertEqual(offset, 7)
+        self.assertEqual(
+            [f.ftp_path for f in journal.unfinished('/data')], [b.ftp_path, c.ftp_path])
+
+        # 모두 끝나면 다음 실행은 다시 조회
+        journal.record(b, DONE)
+        journal.record(c, DONE)
+        self.assertIsNone(journal.unfinished('/data'))
+        self.assertEqual(journal.counts(), {})
+        journal.close()
+
+    def test_interrupted_listing_reports_done_files(self):
+        journal = JobJournal(self.path)
+        journal.start_listing('/data')
+        a = self._files()[0]
+        journal.record(a, QUEUED, root='/data')
+        journal.record(a, DONE)
+        self.assertIsNone(journal.unfinished('/data'))
+        self.assertEqual(journal.start_listing('/data'), {a.ftp_path: (10, 1.0)})
+        journal.close()
+
+    def test_batched_writes(self):
+        journal = JobJournal(self.path, batch_size=2, flush_interval=3600)
+        a, b, _ = self._files()
+        journal.record(a, QUEUED)
+        self.assertEqual(journal._db.execute('SELECT COUNT(*) FROM files').fetchone()[0], 0)
+        journal.record(b, QUEUED)
+        self.assertEqual(journal._db.execute('SELECT COUNT(*) FROM files').fetchone()[0], 2)
+        journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
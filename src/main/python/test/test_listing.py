@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from ftp.ftp_client import FTPClient
+from ftp.listing import MlsdUnsupported, list_dir, parse_list_line, parse_mlsd_line
+from ftp.pool import FTPConnectionPool
+from ftp_server import HAS_PYFTPDLIB, NoMLSDHandler, make_tree, start_server
+
+
+class TestParseListLine(unittest.TestCase):
+
+    def test_unix_file(self):
+        entry = parse_list_line(
+            '-rw-r--r--    1 ftp      ftp       1048576 Feb 19  2016 1MB.zip')
+        self.assertEqual(entry.name, '1MB.zip')
+        self.assertEqual(entry.type, 'file')
+        self.assertEqual(entry.size, 1048576)
+        self.assertEqual(
+            entry.mtime, datetime(2016, 2, 19, tzinfo=timezone.utc).timestamp())
+
+    def test_unix_dir_with_dots_in_name(self):
+        entry = parse_list_line(
+            'drwxr-xr-x    2 ftp      ftp          4096 Mar 01 12:30 data.tar.gz')
+        self.assertEqual(entry.name, 'data.tar.gz')
+        self.assertEqual(entry.type, 'dir')
+        self.assertIsNone(entry.size)
+
+    def test_unix_name_with_spaces(self):
+        entry = parse_list_line(
+            '-rw-r--r--    1 ftp      ftp            10 Jan  2  2020 my file.txt')
+        self.assertEqual(entry.name, 'my file.txt')
+
+    def test_unix_symlink(self):
+        entry = parse_list_line(
+            'lrwxrwxrwx    1 ftp      ftp             4 Jan  2  2020 latest -> 2020')
+        self.assertEqual(entry.name, 'latest')
+        self.assertEqual(entry.type, 'link')
+
+    def test_dos_lines(self):
+        entry = parse_list_line('03-01-20  12:05PM       <DIR>          NPP')
+        self.assertEqual((entry.name, entry.type), ('NPP', 'dir'))
+
+        entry = parse_list_line('03-01-20  01:05AM              1234 a b.tar')
+        self.assertEqual((entry.name, entry.type, entry.size), ('a b.tar', 'file', 1234))
+        self.assertEqual(
+            entry.mtime, datetime(2020, 3, 1, 1, 5, tzinfo=timezone.utc).timestamp())
+
+    def test_unknown_line(self):
+        self.assertIsNone(parse_list_line('total 12'))
+
+
+class TestParseMlsdLine(unittest.TestCase):
+
+    def test_file(self):
+        entry = parse_mlsd_line('type=file;size=1000;modify=20200301120000; a 1.zip\r\n')
+        self.assertEqual(entry.name, 'a 1.zip')
+        self.assertEqual(entry.type, 'file')
+        self.assertEqual(entry.size, 1000)
+        self.assertEqual(
+            entry.mtime, datetime(2020, 3, 1, 12, tzinfo=timezone.utc).timestamp())
+
+    def test_dir_and_cdir(self):
+        self.assertEqual(parse_mlsd_line('Type=dir;Modify=20200301120000; B').type, 'dir')
+        self.assertIsNone(parse_mlsd_line('type=cdir;modify=20200301120000; .'))
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestListFallback(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'root')
+        make_tree(self.root, {'a.zip': b'a' * 10, 'B/b.zip': b'b' * 20})
+        self.server, self.port = start_server(self.root, NoMLSDHandler)
+        self.pool = FTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def test_mlsd_unsupported(self):
+        ftp_handler = self.pool.acquire('127.0.0.1', 'anonymous', 'test@', port=self.port)
+        try:
+            with self.assertRaises(MlsdUnsupported) as context:
+                list_dir(ftp_handler, '/')
+            self.assertTrue(str(context.exception).startswith('500'))
+            self.assertEqual(
+                sorted(entry.name for entry in list_dir(ftp_handler, '/', use_mlsd=False)),
+                ['B', 'a.zip'])
+        finally:
+            self.pool.release(ftp_handler)
+
+    def test_list_without_mlsd(self):
+        ftp_client = FTPClient('127.0.0.1', 'anonymous', 'test@', self.port)
+        ftp_client.pool = self.pool
+        ftp_client.apply_file_to_download('/', os.path.join(self.temp_dir.name, 'local'))
+        self.assertFalse(ftp_client._use_mlsd)
+        self.assertEqual(
+            sorted((f.ftp_path, f.size) for f in ftp_client.file_to_download),
+            [('/B/b.zip', 20), ('/a.zip', 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from ftp.matcher import PathMatcher
+
+
+class TestPathMatcher(unittest.TestCase):
+
+    def test_no_rules_matches_everything(self):
+        matcher = PathMatcher()
+        self.assertTrue(matcher.match_file('/a/b.tar'))
+        self.assertTrue(matcher.match_dir('/a'))
+
+    def test_regex_and_glob_include(self):
+        matcher = PathMatcher(include=[r'\.tar$', 'glob:/20200301/*/NPP/*.xml'])
+        self.assertTrue(matcher.match_file('/20200301/ATMS-SDR/J01/a.tar'))
+        self.assertTrue(matcher.match_file('/20200301/ATMS-SDR/NPP/a.tar.manifest.xml'))
+        self.assertFalse(matcher.match_file('/20200301/ATMS-SDR/J01/a.tar.manifest.xml'))
+
+    def test_exclude_wins_over_include(self):
+        matcher = PathMatcher(include=[r'\.tar$'], exclude=['glob:*/J01/*'])
+        self.assertTrue(matcher.match_file('/2020/NPP/a.tar'))
+        self.assertFalse(matcher.match_file('/2020/J01/a.tar'))
+
+    def test_directory_pruning(self):
+        matcher = PathMatcher(exclude=['glob:*/J01/*', r'^/tmp/', r'\.part$'])
+        self.assertFalse(matcher.match_dir('/2020/J01'))
+        self.assertFalse(matcher.match_dir('/tmp/'))
+        self.assertTrue(matcher.match_dir('/2020/NPP'))
+        # 파일 규칙이 이름이 비슷한 디렉터리를 가지치기 하지 않음
+        self.assertTrue(matcher.match_dir('/2020/data.part.d'))
+        self.assertFalse(matcher.match_file('/2020/a.part'))
+
+    def test_invalid_regex(self):
+        with self.assertRaises(Exception):
+            PathMatcher(include=['(unclosed'])
+
+    def test_rules_with_global_flags(self):
+        matcher = PathMatcher(include=[r'(?i)\.zip$', r'\.tar$'])
+        self.assertTrue(matcher.match_file('/a/B.ZIP'))
+        self.assertTrue(matcher.match_file('/a/b.tar'))
+        self.assertFalse(matcher.match_file('/a/b.TAR'))
+
+    def test_rules_with_backreferences(self):
+        matcher = PathMatcher(include=[r'/(a)x$', r'/(b)\1$', r'\.tar$'])
+        self.assertTrue(matcher.match_file('/bb'))
+        self.assertTrue(matcher.match_file('/ax'))
+        self.assertTrue(matcher.match_file('/a/b.tar'))
+        self.assertFalse(matcher.match_file('/ba'))
+
+
+if __name__ == '__main__':
+    unittest.main()
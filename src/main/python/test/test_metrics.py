@@ -0,0 +1,113 @@
+import os
+import json
+import tempfile
+import unittest
+
+from ftp.metrics import TransferMetrics
+
+
+class FakeClock:
+    """ clock advanced by hand """
+
+    def __init__(self, now: float=0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTransferMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(10.0)
+        self.metrics = TransferMetrics(window=5.0, clock=self.clock)
+
+    def _receive(self) -> None:
+        """ 10초에 /a 100 bytes, 12초에 /a 200 bytes 와 /b 100 bytes """
+        self.assertEqual(self.metrics.add_bytes('/a', 100), 100)
+        self.clock.now = 12.0
+        self.assertEqual(self.metrics.add_bytes('/a', 200), 300)
+        self.assertEqual(self.metrics.add_bytes('/b', 100), 100)
+
+    def test_counters(self):
+        self.metrics.add_expected(1000)
+        self.metrics.add_expected(None)
+        self.metrics.add_skipped(100)
+        self._receive()
+        self.metrics.file_done('/a')
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['files_done'], 1)
+        self.assertEqual(snapshot['bytes_done'], 400)
+        self.assertEqual(snapshot['bytes_skipped'], 100)
+        self.assertEqual(snapshot['bytes_total'], 1000)
+        self.assertEqual(snapshot['files_in_progress'], {'/b': 100})
+
+    def test_nothing_received(self):
+        self.metrics.add_expected(1000)
+
+        self.assertEqual(self.metrics.average_throughput(), 0.0)
+        self.assertEqual(self.metrics.current_throughput(), 0.0)
+        self.assertIsNone(self.metrics.eta())
+
+    def test_throughput_and_eta(self):
+        self.metrics.add_expected(1000)
+        self.metrics.add_skipped(100)
+        self._receive()
+
+        self.clock.now = 14.0
+        self.assertEqual(self.metrics.average_throughput(), 100.0)
+        self.assertEqual(self.metrics.current_throughput(), 100.0)
+        # (1000 - 400 - 100) / 100
+        self.assertEqual(self.metrics.eta(), 5.0)
+
+        # 10초 기록은 창 밖이고 남은 300 bytes 를 창 전체 시간으로 나눔
+        self.clock.now = 16.0
+        self.assertEqual(self.metrics.current_throughput(), 60.0)
+        self.assertAlmostEqual(self.metrics.average_throughput(), 400 / 6)
+        self.assertAlmostEqual(self.metrics.eta(), 500 / 60)
+
+        # 창 안에 기록이 없으면 평균 속도로 계산
+        self.clock.now = 30.0
+        self.assertEqual(self.metrics.current_throughput(), 0.0)
+        self.assertAlmostEqual(self.metrics.eta(), 500 / 20)
+
+    def test_short_run_uses_elapsed_time(self):
+        self.metrics.add_bytes('/a', 100)
+        self.clock.now = 11.0
+        self.metrics.add_bytes('/a', 100)
+
+        self.clock.now = 12.0
+        self.assertEqual(self.metrics.current_throughput(), 100.0)
+
+    def test_eta_when_more_received_than_expected(self):
+        self.metrics.add_expected(100)
+        self._receive()
+
+        self.assertEqual(self.metrics.eta(), 0.0)
+
+    def test_phase(self):
+        with self.metrics.phase('list'):
+            self.clock.now = 13.0
+        with self.assertRaises(ValueError):
+            with self.metrics.phase('list'):
+                self.clock.now = 14.5
+                raise ValueError
+
+        self.assertEqual(
+            self.metrics.snapshot()['phases'], {'list': dict(count=2, seconds=4.5)})
+
+    def test_dump(self):
+        self.metrics.add_expected(1000)
+        self._receive()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'metrics.json')
+            snapshot = self.metrics.dump(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f), snapshot)
+        self.assertEqual(snapshot['bytes_done'], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
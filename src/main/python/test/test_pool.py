@@ -0,0 +1,80 @@
+import time
+import tempfile
+import unittest
+
+from ftp.pool import FTPConnectionPool
+from ftp_server import HAS_PYFTPDLIB, counting, make_tree, start_server
+
+if HAS_PYFTPDLIB:
+    from pyftpdlib.handlers import FTPHandler
+
+
+@unittest.skipUnless(HAS_PYFTPDLIB, 'pyftpdlib is required')
+class TestFTPConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        make_tree(self.temp_dir.name, {'a.zip': b'a'})
+        self.handler = counting(FTPHandler)
+        self.server, self.port = start_server(self.temp_dir.name, self.handler)
+        self.pool = FTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close_all()
+        self.temp_dir.cleanup()
+
+    def _acquire(self, password: str='test@'):
+        return self.pool.acquire('127.0.0.1', 'anonymous', password, True, self.port)
+
+    def _wait_for_connections(self, count: int) -> None:
+        deadline = time.monotonic() + 5
+        while self.handler.current != count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_reuse(self):
+        ftp_handler = self._acquire()
+        self.pool.release(ftp_handler)
+        self.assertIs(self._acquire(), ftp_handler)
+        self.assertEqual(self.handler.peak, 1)
+
+    def test_release_not_reusable(self):
+        ftp_handler = self._acquire()
+        self.pool.release(ftp_handler, reusable=False)
+        self._wait_for_connections(0)
+        self.assertIsNot(self._acquire(), ftp_handler)
+
+    def test_credentials_are_part_of_the_key(self):
+        ftp_handler = self._acquire('first@')
+        self.pool.release(ftp_handler)
+        self.assertIsNot(self._acquire('second@'), ftp_handler)
+        self.assertIs(self._acquire('first@'), ftp_handler)
+
+    def test_dead_session_is_replaced(self):
+        ftp_handler = self._acquire()
+        self.pool.release(ftp_handler)
+        # 서버가 끊은 세션
+        ftp_handler.sendcmd('QUIT')
+        self._wait_for_connections(0)
+
+        # keepalive 스레드는 이미 기다리는 중, 이제부터 재사용할 때마다 NOOP 으로 확인
+        self.pool.keepalive = 0
+
+        new_handler = self._acquire()
+        self.assertIsNot(new_handler, ftp_handler)
+        self.assertEqual(new_handler.pwd(), '/')
+
+    def test_keepalive_closes_old_sessions(self):
+        self.pool.keepalive = 0.05
+        self.pool.max_idle_time = 0.1
+        self.pool.release(self._acquire())
+        self.assertEqual(self.handler.current, 1)
+
+        # 유휴 시간이 지나면 keepalive 스레드가 닫음
+        self._wait_for_connections(0)
+        self.assertEqual(self.pool._idle, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import gzip
+import tarfile
+import tempfile
+import unittest
+
+from ftp.postprocess import PostProcessor, parse_steps, run_steps
+
+
+class TestPostProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _tar(self, name: str) -> str:
+        member = os.path.join(self.root, 'member.txt')
+        with open(member, 'w') as f:
+            f.write('hello')
+        path = os.path.join(self.root, name)
+        with tarfile.open(path, 'w:gz') as archive:
+            archive.add(member, 'member.txt')
+        os.remove(member)
+        return path
+
+    def test_parse_steps(self):
+        steps = parse_steps(['extract', {'move': '/data'}, {'checksum': {'algorithm': 'md5'}}])
+        self.assertEqual(steps, [
+            ('extract', {}), ('move', {'dest': '/data'}), ('checksum', {'algorithm': 'md5'})])
+        with self.assertRaises(ValueError):
+            parse_steps(['unzip'])
+
+    def test_extract_checksum_move(self):
+        path = self._tar('a.tar.gz')
+        archive_dir = os.path.join(self.root, 'archive')
+        steps = parse_steps([{'extract': {'remove': True}}, {'move': archive_dir}])
+
+        result = run_steps(path, steps)
+        self.assertEqual(result['output'], os.path.join(archive_dir, 'a'))
+        with open(os.path.join(archive_dir, 'a', 'member.txt')) as f:
+            self.assertEqual(f.read(), 'hello')
+        self.assertFalse(os.path.exists(path))
+
+    def test_move_existing_target(self):
+        archive_dir = os.path.join(self.root, 'archive')
+        os.makedirs(os.path.join(archive_dir, 'a'))
+        path = os.path.join(self.root, 'a')
+        os.makedirs(path)
+        with open(os.path.join(path, 'new.txt'), 'w') as f:
+            f.write('new')
+
+        with self.assertRaises(FileExistsError):
+            run_steps(path, parse_steps([{'move': archive_dir}]))
+        self.assertTrue(os.path.isdir(path))
+
+        run_steps(path, parse_steps([{'move': {'dest': archive_dir, 'overwrite': True}}]))
+        self.assertEqual(os.listdir(os.path.join(archive_dir, 'a')), ['new.txt'])
+
+    def test_gunzip_and_checksum(self):
+        path = os.path.join(self.root, 'b.txt.gz')
+        with gzip.open(path, 'wb') as f:
+            f.write(b'hello')
+
+        result = run_steps(path, parse_steps(['gunzip', 'checksum']))
+        self.assertEqual(result['output'], path[:-3])
+        with open(path[:-3] + '.sha256') as f:
+            self.assertTrue(f.read().endswith('  b.txt\n'))
+
+    def test_processor_collects_errors(self):
+        good = self._tar('good.tar.gz')
+        bad = os.path.join(self.root, 'bad.tar.gz')
+        with open(bad, 'wb') as f:
+            f.write(b'not a tar')
+
+        processor = PostProcessor(parse_steps(['extract']), workers=2, queue_size=1)
+        processor.submit(good)
+        processor.submit(bad)
+        processor.close()
+        self.assertEqual([result['path'] for result in processor.results], [good])
+        self.assertEqual([path for path, _ in processor.errors], [bad])
+
+
+if __name__ == '__main__':
+    unittest.main()
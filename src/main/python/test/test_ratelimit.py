@@ -0,0 +1,68 @@
+import time
+import threading
+import unittest
+
+from ftp import ratelimit
+from ftp.ratelimit import TokenBucket, shared_bucket
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def _elapsed(self, function) -> float:
+        started = time.monotonic()
+        function()
+        return time.monotonic() - started
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(500000, burst=100000)
+        # 처음에는 burst 만큼 기다리지 않고 가져감
+        self.assertLess(self._elapsed(lambda: bucket.consume(100000)), 0.05)
+        # 이후로는 초당 rate 만큼만, 100KB 에 0.2초
+        elapsed = self._elapsed(lambda: bucket.consume(100000))
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertLess(elapsed, 1)
+
+    def test_concurrent_consumers_share_the_rate(self):
+        bucket = TokenBucket(500000, burst=5000)
+
+        def consume():
+            for _ in range(10):
+                bucket.consume(5000)
+
+        def run():
+            threads = [threading.Thread(target=consume) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # 두 스레드가 100KB 를 받으므로 합쳐서 약 0.2초
+        elapsed = self._elapsed(run)
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertLess(elapsed, 1)
+
+
+class TestSharedBucket(unittest.TestCase):
+
+    def tearDown(self):
+        # 프로세스 전역 상태이므로 다른 테스트에 남기지 않음
+        for key in ('*', 'a.example.com', 'b.example.com'):
+            ratelimit._buckets.pop(key, None)
+
+    def test_global_and_host_buckets(self):
+        global_bucket = shared_bucket('*', 1000)
+        self.assertIs(shared_bucket('*', 1000), global_bucket)
+
+        host_a = shared_bucket('a.example.com', 1000)
+        host_b = shared_bucket('b.example.com', 1000)
+        self.assertIsNot(host_a, host_b)
+        self.assertIsNot(host_a, global_bucket)
+
+        # 새 rate 는 같은 버킷을 쓰는 모두에게 적용
+        self.assertIs(shared_bucket('a.example.com', 2000), host_a)
+        self.assertEqual((host_a.rate, host_a.burst), (2000, 2000))
+        self.assertEqual(host_b.rate, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
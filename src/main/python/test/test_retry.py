@@ -0,0 +1,51 @@
+import os
+import ftplib
+import socket
+import tempfile
+import unittest
+
+from ftp.ftp_file import FTPFile
+from ftp.retry import (
+    PERMANENT, TRANSIENT, RetryPolicy, classify_error, load_failed_files, save_failed_files)
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_classify_error(self):
+        self.assertEqual(classify_error(ftplib.error_temp('421 busy')), TRANSIENT)
+        self.assertEqual(classify_error(ftplib.error_perm('550 not found')), PERMANENT)
+        self.assertEqual(classify_error(socket.timeout()), TRANSIENT)
+        self.assertEqual(classify_error(ConnectionResetError()), TRANSIENT)
+        self.assertEqual(classify_error(EOFError()), TRANSIENT)
+        self.assertEqual(classify_error(PermissionError()), PERMANENT)
+        self.assertEqual(classify_error(ValueError()), PERMANENT)
+
+    def test_retry_policy(self):
+        policy = RetryPolicy(max_retries=2, base_delay=1, max_delay=3)
+        error = ftplib.error_temp('421 busy')
+        self.assertTrue(policy.should_retry(error, 0))
+        self.assertTrue(policy.should_retry(error, 1))
+        self.assertFalse(policy.should_retry(error, 2))
+        self.assertFalse(policy.should_retry(ftplib.error_perm('550'), 0))
+        for attempt in range(5):
+            self.assertLessEqual(policy.delay(attempt), 3)
+
+    def test_failed_files_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'failed.json')
+            ftp_file = FTPFile('/remote/a.tar', os.path.join(temp_dir, 'a.tar'), 10, 1.0)
+            ftp_file.error = 'error_temp: 421 busy'
+            save_failed_files(path, [ftp_file])
+
+            loaded = load_failed_files(path)
+            self.assertEqual(len(loaded), 1)
+            self.assertEqual(loaded[0].ftp_path, ftp_file.ftp_path)
+            self.assertEqual(loaded[0].local_path, ftp_file.local_path)
+            self.assertEqual(loaded[0].size, 10)
+
+            save_failed_files(path, [])
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
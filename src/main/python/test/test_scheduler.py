@@ -0,0 +1,112 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+
+from ftp.cli import run_config
+from ftp.scheduler import JobScheduler
+from ftp.util import get_cfg, get_jobs, get_scheduler_cfg, save_cfg
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    def test_budget_and_host_caps(self):
+        scheduler = JobScheduler(max_workers=4, max_host_connections=2)
+        lock = threading.Lock()
+        running = dict(total=0, a=0, peak_total=0, peak_a=0)
+
+        def run_job(job):
+            with lock:
+                running['total'] += job['workers']
+                running[job['url']] = running.get(job['url'], 0) + job['workers']
+                running['peak_total'] = max(running['peak_total'], running['total'])
+                running['peak_a'] = max(running['peak_a'], running['a'])
+            time.sleep(0.05)
+            with lock:
+                running['total'] -= job['workers']
+                running[job['url']] -= job['workers']
+            return job['name']
+
+        jobs = [dict(name=f'job{i}', url='a' if i < 4 else 'b', workers=3) for i in range(6)]
+        self.assertEqual(scheduler.run(jobs, run_job), [job['name'] for job in jobs])
+        self.assertLessEqual(running['peak_total'], 4)
+        self.assertLessEqual(running['peak_a'], 2)
+
+    def test_failing_job_releases_its_slot(self):
+        scheduler = JobScheduler(max_workers=2)
+
+        def run_job(job):
+            if job['name'] == 'bad':
+                raise ValueError('bad job')
+            return job['name']
+
+        # url 이 없거나 workers 가 잘못된 작업도 다른 작업을 막지 않음
+        jobs = [dict(name='bad'), dict(name='broken', url='a', workers='x'),
+                dict(name='good', url='a', workers=2)]
+        self.assertEqual(scheduler.run(jobs, run_job), [None, None, 'good'])
+        self.assertEqual((scheduler._free, scheduler._waiting), (2, 0))
+
+    def test_run_config_job_without_url(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, 'config.yml')
+            with open(config_file, 'w') as f:
+                f.write(
+                    'ftp:\n  username: anonymous\n  password: x\n'
+                    'jobs:\n- name: no-url\n- name: no-dirs\n  url: a.example.com\n')
+            summaries = run_config(config_file)
+            self.assertEqual([summary['job'] for summary in summaries], ['no-url', 'no-dirs'])
+            self.assertEqual([summary['status'] for summary in summaries], ['error', 'error'])
+
+    def test_host_override(self):
+        scheduler = JobScheduler.from_cfg(dict(max_host_connections=2, host_connections={'a': 5}))
+        self.assertEqual(scheduler.host_limit('a'), 5)
+        self.assertEqual(scheduler.host_limit('b'), 2)
+
+
+class TestGetJobs(unittest.TestCase):
+
+    def test_jobs_inherit_ftp_block(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, 'config.yml')
+            with open(config_file, 'w') as f:
+                f.write(
+                    'ftp:\n  username: anonymous\n  password: x\n  workers: 2\n'
+                    'jobs:\n'
+                    '- url: a.example.com\n  workers: 4\n'
+                    '- name: mirror-b\n  url: b.example.com\n')
+            jobs = get_jobs(config_file)
+            self.assertEqual([job['name'] for job in jobs], ['a.example.com', 'mirror-b'])
+            self.assertEqual([job['workers'] for job in jobs], [4, 2])
+            self.assertEqual(jobs[1]['username'], 'anonymous')
+            self.assertEqual(get_cfg(config_file)['username'], 'anonymous')
+
+    def test_save_cfg_keeps_other_jobs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, 'config.yml')
+            with open(config_file, 'w') as f:
+                f.write(
+                    'ftp:\n  username: anonymous\n  password: x\n'
+                    'scheduler:\n  max_workers: 12\n'
+                    'jobs:\n'
+                    '- url: a.example.com\n  workers: 4\n'
+                    '- name: mirror-b\n  url: b.example.com\n')
+            save_cfg(config_file, dict(url='c.example.com', username='anonymous', password='y'))
+
+            jobs = get_jobs(config_file)
+            self.assertEqual([job['url'] for job in jobs], ['c.example.com', 'b.example.com'])
+            self.assertEqual([job['password'] for job in jobs], ['y', 'x'])
+            self.assertEqual(jobs[0]['workers'], 4)
+            self.assertEqual(get_scheduler_cfg(config_file), {'max_workers': 12})
+
+    def test_save_cfg_single_ftp_block(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, 'config.yml')
+            with open(config_file, 'w') as f:
+                f.write('ftp:\n  url: a.example.com\n  workers: 3\n')
+            save_cfg(config_file, dict(url='b.example.com'))
+            self.assertEqual(get_cfg(config_file), {'url': 'b.example.com', 'workers': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from ftp.ftp_file import FTPFile
+from ftp.sink import CallbackSink, FileSink, MemorySink, PipeSink, SinkError, get_sink
+
+
+class TestSink(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ftp_file = FTPFile('/data/a.txt', os.path.join(self.temp_dir.name, 'sub', 'a.txt'),
+                                5, 1000000.0)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, sink, chunks=(b'hel', b'lo')):
+        writer = sink.open(self.ftp_file)
+        for chunk in chunks:
+            self.assertEqual(writer.write(memoryview(chunk)), len(chunk))
+        return writer
+
+    def test_file_sink_commit(self):
+        for tmpfile in (True, False):
+            writer = self._write(FileSink(tmpfile))
+            # 다 받기 전에는 대상 파일이 보이지 않음
+            self.assertFalse(os.path.exists(self.ftp_file.local_path))
+            writer.commit()
+            with open(self.ftp_file.local_path, 'rb') as f:
+                self.assertEqual(f.read(), b'hello')
+            self.assertEqual(os.path.getmtime(self.ftp_file.local_path), 1000000.0)
+            self.assertEqual(os.listdir(self.ftp_file.local_dir), ['a.txt'])
+            os.remove(self.ftp_file.local_path)
+
+    def test_file_sink_abort_leaves_nothing(self):
+        for tmpfile in (True, False):
+            self._write(FileSink(tmpfile)).abort()
+            self.assertEqual(os.listdir(self.ftp_file.local_dir), [])
+
+    def test_memory_and_callback_sinks(self):
+        sink = MemorySink()
+        self._write(sink).commit()
+        self.assertEqual(sink.data, {'/data/a.txt': b'hello'})
+
+        received, done = list(), list()
+        sink = CallbackSink(lambda ftp_file, chunk: received.append(bytes(chunk)), done.append)
+        self._write(sink).commit()
+        self.assertEqual(b''.join(received), b'hello')
+        self.assertEqual(done, [self.ftp_file])
+
+    def test_pipe_sink(self):
+        code = 'import os, sys; open(os.environ["LOCAL_PATH"], "wb").write(sys.stdin.buffer.read())'
+        self._write(PipeSink([sys.executable, '-c', code])).commit()
+        with open(self.ftp_file.local_path, 'rb') as f:
+            self.assertEqual(f.read(), b'hello')
+
+        with self.assertRaises(SinkError):
+            self._write(PipeSink([sys.executable, '-c', 'import sys; sys.exit(3)']), []).commit()
+
+    def test_get_sink(self):
+        self.assertIsNone(get_sink(None))
+        self.assertIsInstance(get_sink('file'), FileSink)
+        self.assertEqual(get_sink({'pipe': 'cat'}).command, 'cat')
+        with self.assertRaises(ValueError):
+            get_sink('s3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import zlib
+import hashlib
+import tempfile
+import unittest
+
+from ftp.verify import StreamHasher, _find_hex
+
+
+class TestStreamHasher(unittest.TestCase):
+
+    def test_incremental_matches_one_shot(self):
+        data = os.urandom(100000)
+        hasher = StreamHasher(['md5', 'sha256', 'crc32'])
+        for i in range(0, len(data), 4096):
+            hasher.update(memoryview(data)[i:i + 4096])
+
+        digests = hasher.hexdigests()
+        self.assertEqual(digests['md5'], hashlib.md5(data).hexdigest())
+        self.assertEqual(digests['sha256'], hashlib.sha256(data).hexdigest())
+        self.assertEqual(digests['crc32'], f'{zlib.crc32(data):08x}')
+
+    def test_update_from_partial_file(self):
+        data = os.urandom(5000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'partial')
+            with open(path, 'wb') as f:
+                f.write(data)
+
+            hasher = StreamHasher(['sha1'])
+            hasher.update_from_file(path, 3000, blocksize=1024)
+            hasher.update(data[3000:])
+            self.assertEqual(hasher.hexdigests()['sha1'], hashlib.sha1(data).hexdigest())
+
+    def test_find_hex_in_replies(self):
+        digest = 'd41d8cd98f00b204e9800998ecf8427e'
+        self.assertEqual(_find_hex(f'{digest.upper()}  file.tar\n', 'md5'), digest)
+        self.assertEqual(_find_hex(f'213 MD5 0-0 {digest} file.tar', 'md5'), digest)
+        self.assertEqual(_find_hex('250 1A2B3C4D', 'crc32'), '1a2b3c4d')
+        self.assertIsNone(_find_hex('550 not found', 'sha256'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+from PyQt5 import QtCore
+
+
+class FileListModel(QtCore.QAbstractListModel):
+    """
+    list model over FTPFile objects, one row per file
+
+    rows keep a reference to the FTPFile only and the text is built when
+    the view asks for a visible row, so 100k files cost one list slot
+    each. Files are added in batches with a single insert notification.
+    """
+
+    def __init__(self, attribute: str = "ftp_path", parent=None):
+        """
+        :param str attribute: FTPFile attribute shown in the view (`ftp_path`, `local_path`)
+        """
+        super().__init__(parent)
+        self.attribute = attribute
+        self._files = list()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        # 리스트 모델이므로 하위 항목 없음
+        return 0 if parent.isValid() else len(self._files)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._files):
+            return None
+
+        ftp_file = self._files[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return getattr(ftp_file, self.attribute)
+        if role == QtCore.Qt.ToolTipRole:
+            return ftp_file.error
+        if role == QtCore.Qt.UserRole:
+            return ftp_file
+        return None
+
+    def append_files(self, ftp_files: list) -> None:
+        if not ftp_files:
+            return
+
+        first = len(self._files)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(ftp_files) - 1)
+        self._files.extend(ftp_files)
+        self.endInsertRows()
+
+    def set_files(self, ftp_files) -> None:
+        """ replace every row, e.g. with the client's download queue """
+        self.beginResetModel()
+        self._files = list(ftp_files)
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.set_files([])
@@ -76,6 +76,10 @@ class Ui_MainWindow(object):
         self.pushButtonCancel.setMaximumSize(QtCore.QSize(100, 100))
         self.pushButtonCancel.setObjectName("pushButtonCancel")
         self.horizontalLayout_3.addWidget(self.pushButtonCancel)
+        self.pushButtonPause = QtWidgets.QPushButton(self.centralwidget)
+        self.pushButtonPause.setMaximumSize(QtCore.QSize(100, 100))
+        self.pushButtonPause.setObjectName("pushButtonPause")
+        self.horizontalLayout_3.addWidget(self.pushButtonPause)
         self.pushButtonApply = QtWidgets.QPushButton(self.centralwidget)
         self.pushButtonApply.setMaximumSize(QtCore.QSize(100, 100))
         self.pushButtonApply.setObjectName("pushButtonApply")
@@ -109,6 +113,7 @@ class Ui_MainWindow(object):
         self.labelDownloadComplete.setText(_translate("MainWindow", "Download Complete"))
         self.pushButtonDownload.setText(_translate("MainWindow", "Download"))
         self.pushButtonCancel.setText(_translate("MainWindow", "Cancel"))
+        self.pushButtonPause.setText(_translate("MainWindow", "Pause"))
         self.pushButtonApply.setText(_translate("MainWindow", "Apply"))
         self.menuFile.setTitle(_translate("MainWindow", "File"))
         self.actionConfig.setText(_translate("MainWindow", "Config"))